@@ -1,34 +1,601 @@
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
+import argparse
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
 import time
 import random
+import numpy as np
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor
+from http_cache import HttpCache
+from data_loader import (write_results_arrow, load_results, default_results_path, read_manifest, player_keys,
+                         PlayerIndex, INFO_COLUMNS, MANIFEST, DELTA_RESULTS)
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from functools import partial
 
+try:
+    import lxml
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
+class TokenBucket:
+    def __init__(self, rate, capacity=1):
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                    
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+STAT_COLUMNS = [
+    'playing_time_matches', 'playing_time_starts', 'playing_time_minutes', 'performance_goals',
+    'performance_assists', 'performance_yellow_cards', 'performance_red_cards', 'expected_xg',
+    'expected_xag', 'progression_prgc', 'progression_prgp', 'progression_prgr', 'per_90_goals',
+    'per_90_assists', 'per_90_xg', 'per_90_xag', 'goalkeeping_ga90', 'goalkeeping_save_pct',
+    'goalkeeping_cs_pct', 'goalkeeping_pen_save_pct', 'shooting_sot_pct', 'shooting_sot_per90',
+    'shooting_goals_per_shot', 'shooting_avg_shot_dist', 'passing_total_completed',
+    'passing_total_completion_pct', 'passing_total_total_distance', 'passing_ranges_short_pct',
+    'passing_ranges_medium_pct', 'passing_ranges_long_pct', 'passing_expected_key_passes',
+    'passing_expected_final_third', 'passing_expected_penalty_area', 'passing_expected_crosses',
+    'passing_expected_progressive', 'creation_sca', 'creation_sca90', 'creation_gca',
+    'creation_gca90', 'defense_tackles', 'defense_tackles_won', 'defense_challenges',
+    'defense_challenges_lost', 'defense_blocks', 'defense_shot_blocks', 'defense_pass_blocks',
+    'defense_interceptions', 'possession_touches_total', 'possession_touches_def_pen',
+    'possession_touches_def_3rd', 'possession_touches_mid_3rd', 'possession_touches_att_3rd',
+    'possession_touches_att_pen', 'possession_take_ons_attempted',
+    'possession_take_ons_success_pct', 'possession_take_ons_tackled_pct',
+    'possession_carries_total', 'possession_carries_prog_distance',
+    'possession_carries_progressive', 'possession_carries_final_third',
+    'possession_carries_penalty_area', 'possession_carries_miscontrols',
+    'possession_carries_dispossessed', 'possession_receiving_received',
+    'possession_receiving_progressive', 'miscellaneous_performance_fouls',
+    'miscellaneous_performance_fouled', 'miscellaneous_performance_offsides',
+    'miscellaneous_performance_crosses', 'miscellaneous_performance_recoveries',
+    'miscellaneous_aerials_won', 'miscellaneous_aerials_lost', 'miscellaneous_aerials_win_pct'
+]
+
+COLUMN_INDEX = {column: i for i, column in enumerate(STAT_COLUMNS)}
+
+STAT_TABLE_FIELDS = {
+    'standard': {
+        'games': 'playing_time_matches',
+        'games_starts': 'playing_time_starts',
+        'goals': 'performance_goals',
+        'assists': 'performance_assists',
+        'cards_yellow': 'performance_yellow_cards',
+        'cards_red': 'performance_red_cards',
+        'xg': 'expected_xg',
+        'xg_assist': 'expected_xag',
+        'progressive_carries': 'progression_prgc',
+        'progressive_passes': 'progression_prgp',
+        'progressive_passes_received': 'progression_prgr',
+        'goals_per90': 'per_90_goals',
+        'assists_per90': 'per_90_assists',
+        'xg_per90': 'per_90_xg',
+        'xg_assist_per90': 'per_90_xag'
+    },
+    'keeper': {
+        'gk_goals_against_per90': 'goalkeeping_ga90',
+        'gk_save_pct': 'goalkeeping_save_pct',
+        'gk_clean_sheets_pct': 'goalkeeping_cs_pct',
+        'gk_pens_save_pct': 'goalkeeping_pen_save_pct'
+    },
+    'shooting': {
+        'shots_on_target_pct': 'shooting_sot_pct',
+        'shots_on_target_per90': 'shooting_sot_per90',
+        'goals_per_shot': 'shooting_goals_per_shot',
+        'average_shot_distance': 'shooting_avg_shot_dist'
+    },
+    'passing': {
+        'passes_completed': 'passing_total_completed',
+        'passes_pct': 'passing_total_completion_pct',
+        'passes_total_distance': 'passing_total_total_distance',
+        'passes_pct_short': 'passing_ranges_short_pct',
+        'passes_pct_medium': 'passing_ranges_medium_pct',
+        'passes_pct_long': 'passing_ranges_long_pct',
+        'assisted_shots': 'passing_expected_key_passes',
+        'passes_into_final_third': 'passing_expected_final_third',
+        'passes_into_penalty_area': 'passing_expected_penalty_area',
+        'crosses_into_penalty_area': 'passing_expected_crosses',
+        'progressive_passes': 'passing_expected_progressive'
+    },
+    'gca': {
+        'sca': 'creation_sca',
+        'sca_per90': 'creation_sca90',
+        'gca': 'creation_gca',
+        'gca_per90': 'creation_gca90'
+    },
+    'defense': {
+        'tackles': 'defense_tackles',
+        'tackles_won': 'defense_tackles_won',
+        'challenges': 'defense_challenges',
+        'challenges_lost': 'defense_challenges_lost',
+        'blocks': 'defense_blocks',
+        'blocked_shots': 'defense_shot_blocks',
+        'blocked_passes': 'defense_pass_blocks',
+        'interceptions': 'defense_interceptions'
+    },
+    'possession': {
+        'touches': 'possession_touches_total',
+        'touches_def_pen_area': 'possession_touches_def_pen',
+        'touches_def_3rd': 'possession_touches_def_3rd',
+        'touches_mid_3rd': 'possession_touches_mid_3rd',
+        'touches_att_3rd': 'possession_touches_att_3rd',
+        'touches_att_pen_area': 'possession_touches_att_pen',
+        'take_ons': 'possession_take_ons_attempted',
+        'take_ons_won_pct': 'possession_take_ons_success_pct',
+        'take_ons_tackled_pct': 'possession_take_ons_tackled_pct',
+        'carries': 'possession_carries_total',
+        'carries_progressive_distance': 'possession_carries_prog_distance',
+        'progressive_carries': 'possession_carries_progressive',
+        'carries_into_final_third': 'possession_carries_final_third',
+        'carries_into_penalty_area': 'possession_carries_penalty_area',
+        'miscontrols': 'possession_carries_miscontrols',
+        'dispossessed': 'possession_carries_dispossessed',
+        'passes_received': 'possession_receiving_received',
+        'progressive_passes_received': 'possession_receiving_progressive'
+    },
+    'misc': {
+        'fouls': 'miscellaneous_performance_fouls',
+        'fouled': 'miscellaneous_performance_fouled',
+        'offsides': 'miscellaneous_performance_offsides',
+        'crosses': 'miscellaneous_performance_crosses',
+        'ball_recoveries': 'miscellaneous_performance_recoveries',
+        'aerials_won': 'miscellaneous_aerials_won',
+        'aerials_lost': 'miscellaneous_aerials_lost',
+        'aerials_won_pct': 'miscellaneous_aerials_win_pct'
+    }
+}
+
+def stat_table_id(kind, competition_id=9):
+    return f"stats_{kind}_{competition_id}"
+
+LINK_STATS = ('player', 'team')
+TABLE_OPEN_TAG = re.compile(r'<table\b[^>]*\bid="([^"]+)"')
+PLAYER_HREF = re.compile(r'/players/([0-9a-f]{8})(?:/|$)')
+
+def locate_table_fragments(html, table_ids):
+    wanted = set(table_ids)
+    fragments = {}
+    for match in TABLE_OPEN_TAG.finditer(html):
+        table_id = match.group(1)
+        if table_id not in wanted or table_id in fragments:
+            continue
+            
+        end = html.find('</table>', match.end())
+        if end == -1:
+            continue
+            
+        fragments[table_id] = html[match.start():end + len('</table>')]
+        if len(fragments) == len(wanted):
+            break
+            
+    return fragments
+
+def parse_row(row, key_stat='player'):
+    cells = {}
+    for cell in row.find_all(['th', 'td'], recursive=False):
+        stat = cell.get('data-stat')
+        if not stat:
+            continue
+            
+        if stat in LINK_STATS:
+            link = cell.find('a')
+            if not link:
+                continue
+            cells[stat] = link.text.strip()
+            cells[f"{stat}_href"] = link.get('href', '')
+        else:
+            cells[stat] = cell.text.strip()
+            
+    return cells if key_stat in cells else None
+
+def iter_table_rows(soup, table_id, key_stat='player'):
+    table = soup.find('table', {'id': table_id})
+    if not table or not (body := table.find('tbody')):
+        return
+        
+    for row in body.find_all('tr'):
+        if (cells := parse_row(row, key_stat)):
+            yield cells
+
+class SoupBackend:
+    def __init__(self, features='html.parser'):
+        self.name = features
+        self.features = features
+        
+    def parse_table(self, fragment, table_id, key_stat='player'):
+        soup = BeautifulSoup(fragment, self.features)
+        return list(iter_table_rows(soup, table_id, key_stat))
+
+class SelectolaxBackend:
+    name = 'selectolax'
+    
+    def parse_row(self, row, key_stat='player'):
+        cells = {}
+        for cell in row.iter():
+            if cell.tag not in ('th', 'td') or not (stat := cell.attributes.get('data-stat')):
+                continue
+                
+            if stat in LINK_STATS:
+                link = cell.css_first('a')
+                if not link:
+                    continue
+                cells[stat] = link.text().strip()
+                cells[f"{stat}_href"] = link.attributes.get('href') or ''
+            else:
+                cells[stat] = cell.text().strip()
+                
+        return cells if key_stat in cells else None
+        
+    def parse_table(self, fragment, table_id, key_stat='player'):
+        rows = []
+        if (table := HTMLParser(fragment).css_first(f'table#{table_id}')):
+            for row in table.css('tbody > tr'):
+                if (cells := self.parse_row(row, key_stat)):
+                    rows.append(cells)
+        return rows
+
+def extract_tables(backend, html, table_ids, key_stat='player'):
+    fragments = locate_table_fragments(html, table_ids)
+    return {
+        table_id: backend.parse_table(fragments[table_id], table_id, key_stat)
+        for table_id in table_ids if table_id in fragments
+    }
+
+def available_parsers():
+    parsers = ['html.parser']
+    if HAS_LXML:
+        parsers.insert(0, 'lxml')
+    if HTMLParser is not None:
+        parsers.insert(0, 'selectolax')
+    return parsers
+
+def get_parser_backend(name=None):
+    name = name or available_parsers()[0]
+    if name not in available_parsers():
+        raise ValueError(f"Parser '{name}' is not available (installed: {', '.join(available_parsers())})")
+        
+    return SelectolaxBackend() if name == 'selectolax' else SoupBackend(name)
+
+def parse_number(text):
+    text = text.strip().replace(',', '').rstrip('%')
+    if not text:
+        return np.nan
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+def player_id_from_href(href):
+    match = PLAYER_HREF.search(href or '')
+    return match.group(1) if match else 'N/A'
+
+def player_key(player_id, name, team):
+    if player_id != 'N/A':
+        return int(player_id, 16)
+    return -int(hashlib.sha1(f"{name}|{team}".encode('utf-8')).hexdigest()[:15], 16)
+
+def row_player_key(cells, team_name):
+    return player_key(player_id_from_href(cells.get('player_href')), cells['player'], team_name)
+
+class PlayerRecord:
+    __slots__ = ('name', 'player_id', 'team', 'nation', 'position', 'age', 'values')
+    
+    def __init__(self, name, player_id='N/A', team='N/A', nation='N/A', position='N/A', age='N/A', values=None):
+        self.name = name
+        self.player_id = player_id
+        self.team = team
+        self.nation = nation
+        self.position = position
+        self.age = age
+        self.values = np.full(len(STAT_COLUMNS), np.nan) if values is None else np.asarray(values, dtype=float)
+        
+    def update(self, fields):
+        for column, value in fields.items():
+            if column in COLUMN_INDEX:
+                self.values[COLUMN_INDEX[column]] = value
+            else:
+                setattr(self, column, value)
+                
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'player_id': self.player_id,
+            'team': self.team,
+            'nation': self.nation,
+            'position': self.position,
+            'age': self.age,
+            'values': self.values.tolist()
+        }
+        
+    @property
+    def key(self):
+        return player_key(self.player_id, self.name, self.team)
+        
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+def collect_fields(cells, fields):
+    return {column: parse_number(cells[stat]) for stat, column in fields.items() if stat in cells}
+
+def parse_standard_rows(rows, team_name):
+    partial = {}
+    for cells in rows:
+        key = row_player_key(cells, team_name)
+        
+        try:
+            mins = int(cells.get('minutes', '').replace(',', ''))
+        except ValueError:
+            mins = 0
+            
+        if mins < 90:
+            partial.pop(key, None)
+            continue
+            
+        values = collect_fields(cells, STAT_TABLE_FIELDS['standard'])
+        values['name'] = cells['player']
+        values['player_id'] = player_id_from_href(cells.get('player_href'))
+        values['team'] = team_name
+        values['playing_time_minutes'] = float(mins)
+        
+        if 'nationality' in cells:
+            nation_text = cells['nationality']
+            values['nation'] = nation_text.split()[-1] if ' ' in nation_text else nation_text
+            
+        if 'position' in cells:
+            values['position'] = cells['position']
+            
+        if 'age' in cells:
+            values['age'] = cells['age']
+            
+        partial[key] = values
+        
+    return partial
+
+def parse_table_partial(backend, kind, fragment, table_id, team_name):
+    if fragment is None:
+        return {}
+        
+    rows = backend.parse_table(fragment, table_id)
+    if kind == 'standard':
+        return parse_standard_rows(rows, team_name)
+        
+    fields = STAT_TABLE_FIELDS[kind]
+    return {row_player_key(cells, team_name): collect_fields(cells, fields) for cells in rows}
+
+def build_team_records(partials):
+    standard = partials['standard']
+    records = {}
+    for key in standard:
+        record = PlayerRecord(standard[key]['name'])
+        for kind in STAT_TABLE_FIELDS:
+            record.update(partials[kind].get(key, {}))
+        records[key] = record
+        
+    return records
+
+def parse_team_page(backend, team_name, team_html, competition_id=9, known_hash=None):
+    started = time.perf_counter()
+    table_ids = {kind: stat_table_id(kind, competition_id) for kind in STAT_TABLE_FIELDS}
+    fragments = locate_table_fragments(team_html, table_ids.values())
+    missing = [table_id for table_id in table_ids.values() if table_id not in fragments]
+    
+    content = ''.join(fragments[table_id] for table_id in sorted(fragments))
+    content_hash = hashlib.sha1(content.encode('utf-8')).hexdigest()
+    if content_hash == known_hash:
+        return None, missing, time.perf_counter() - started, content_hash
+    
+    partials = {
+        kind: parse_table_partial(backend, kind, fragments.get(table_id), table_id, team_name)
+        for kind, table_id in table_ids.items()
+    }
+    return build_team_records(partials), missing, time.perf_counter() - started, content_hash
+
+def build_results_frame(player_data):
+    players = sorted(player_data.values(), key=lambda record: (record.name, record.player_id))
+    info = pd.DataFrame({
+        'Name': [record.name for record in players],
+        'PlayerID': [record.player_id for record in players],
+        'Team': [record.team for record in players],
+        'Nation': [record.nation for record in players],
+        'Position': [record.position for record in players],
+        'Age': [record.age for record in players]
+    })
+    values = np.vstack([record.values for record in players]) if players else np.empty((0, len(STAT_COLUMNS)))
+    stats = pd.DataFrame(values, columns=STAT_COLUMNS)
+    
+    return pd.concat([info, stats], axis=1)
+
+def records_from_frame(df):
+    info = df[INFO_COLUMNS].fillna('N/A').astype(str)
+    values = df[STAT_COLUMNS].to_numpy(dtype=float)
+    records = (PlayerRecord(*fields, values=row) for fields, row in zip(info.itertuples(index=False), values))
+    return {record.key: record for record in records}
+
+def compute_delta(previous, current, changed_teams):
+    columns = list(current.columns)
+    prev_keys, curr_keys = player_keys(previous), player_keys(current)
+    affected = (set(prev_keys[previous['Team'].isin(changed_teams)])
+                | set(curr_keys[current['Team'].isin(changed_teams)]))
+    prev = previous.set_index(prev_keys)[prev_keys.isin(affected).to_numpy()]
+    curr = current.set_index(curr_keys)[curr_keys.isin(affected).to_numpy()]
+    
+    common = curr.index.intersection(prev.index)
+    old, new = prev.loc[common, columns], curr.loc[common, columns]
+    same = ((old == new) | (old.isna() & new.isna())).all(axis=1)
+    
+    moved = common[(old['Team'] != new['Team']).to_numpy()]
+    
+    upserts = curr.loc[curr.index.difference(prev.index).union(common[~same.to_numpy()])]
+    deletes = prev.loc[prev.index.difference(curr.index).union(moved)]
+    delta = pd.concat([upserts.assign(Change='upsert'), deletes.assign(Change='delete')])
+    return delta[columns + ['Change']].sort_values(by=['Name', 'PlayerID', 'Change']).reset_index(drop=True)
+
+def write_results_csv(df, filename):
+    df.to_csv(filename, index=False, encoding='utf-8-sig', na_rep='N/A', float_format='%.15g')
+
+def record_minutes(record):
+    minutes = record.values[COLUMN_INDEX['playing_time_minutes']]
+    return -np.inf if np.isnan(minutes) else minutes
+
+class PlayerStore:
+    def __init__(self, teams=None):
+        self.teams = dict(teams or {})
+        self.lock = threading.Lock()
+        
+    def add_team(self, team_name, records, content_hash=None):
+        with self.lock:
+            self.teams[team_name] = {'records': records, 'content_hash': content_hash}
+            
+    def snapshot(self):
+        with self.lock:
+            return dict(self.teams)
+            
+    def to_dict(self):
+        return {
+            team_name: {
+                'records': [record.to_dict() for record in team['records'].values()],
+                'content_hash': team['content_hash']
+            }
+            for team_name, team in self.snapshot().items()
+        }
+        
+    @classmethod
+    def from_dict(cls, data):
+        return cls({
+            team_name: {
+                'records': {record.key: record for record in map(PlayerRecord.from_dict, team['records'])},
+                'content_hash': team.get('content_hash')
+            }
+            for team_name, team in data.items()
+        })
+            
+    def content_hashes(self):
+        return {team_name: team['content_hash'] for team_name, team in self.snapshot().items()}
+            
+    def merged(self):
+        players = PlayerIndex()
+        for team_name, team in sorted(self.snapshot().items()):
+            for key, record in team['records'].items():
+                if key not in players or record_minutes(record) > record_minutes(players[key]):
+                    players.add(key, record.name, record)
+        return players
+
 class FootballDataScraper:
-    def __init__(self):
+    def __init__(self, max_concurrency=1, requests_per_second=None, parser=None, cache=None,
+                 checkpoint_path=None, pipeline=False, parse_workers=None, queue_size=4,
+                 incremental=False):
         self.session = requests.Session()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept-Language': 'en-US,en;q=0.9'
         }
         self.session.headers.update(self.headers)
+        self.max_concurrency = max(1, max_concurrency)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.base_url = "https://fbref.com"
-        self.player_data = {}
+        self.store = PlayerStore()
         self.team_count = 0
         self.request_delay = (3, 6)
+        if not requests_per_second and self.max_concurrency > 1:
+            requests_per_second = 2 / sum(self.request_delay)
+        self.rate_limiter = TokenBucket(requests_per_second) if requests_per_second else None
+        self.timings = {'requests': 0, 'network': 0.0, 'parsing': 0.0}
+        self.timings_lock = threading.Lock()
+        self.parser = get_parser_backend(parser)
+        self.cache = cache
+        self.checkpoint_path = checkpoint_path
+        self.completed_teams = set()
+        self.checkpoint_lock = threading.Lock()
+        self.pipeline = pipeline
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.queue_size = max(1, queue_size)
+        self.incremental = incremental
+        self.manifest_path = MANIFEST
+        self.delta_path = DELTA_RESULTS
+        self.previous_hashes = {}
+        self.previous_teams = {}
+        self.previous_snapshot = None
+        self.previous_frame = None
+        
+    @property
+    def player_data(self):
+        return self.store.merged()
+        
+    def record_timing(self, key, value):
+        with self.timings_lock:
+            self.timings[key] += value
+            
+    def throttle(self):
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        else:
+            time.sleep(random.uniform(*self.request_delay))
         
     def fetch_page(self, url, max_retries=3):
+        cached = self.cache.lookup(url) if self.cache else None
+        if cached and self.cache.is_fresh(cached):
+            if (body := self.cache.read(url, cached, 'hits')) is not None:
+                return body
+            cached = None
+            
         for attempt in range(max_retries):
             try:
-                time.sleep(random.uniform(*self.request_delay))
-                response = self.session.get(url, timeout=15)
+                self.throttle()
+                started = time.perf_counter()
+                self.record_timing('requests', 1)
+                headers = self.cache.conditional_headers(cached) if cached else None
+                try:
+                    response = self.session.get(url, timeout=15, headers=headers)
+                finally:
+                    self.record_timing('network', time.perf_counter() - started)
+                    
+                if response.status_code == 304 and cached:
+                    if (body := self.cache.read(url, cached, 'revalidated')) is not None:
+                        return body
+                    cached = None
+                    continue
+                    
                 response.raise_for_status()
                 
                 if 'text/html' not in response.headers.get('Content-Type', ''):
                     raise ValueError("Invalid content type")
                     
+                if self.cache:
+                    self.cache.store(url, response.text, response.headers)
                 return response.text
                 
             except requests.exceptions.RequestException as e:
@@ -37,146 +604,13 @@ class FootballDataScraper:
                     return None
                 time.sleep(random.uniform(5, 10))
     
-    def initialize_player_record(self, player_name):
-        return {
-            "info": {
-                "name": player_name,
-                "team": "N/A",
-                "nation": "N/A",
-                "position": "N/A",
-                "age": "N/A"
-            },
-            "playing_time": {
-                "matches": "N/A",
-                "starts": "N/A",
-                "minutes": "N/A"
-            },
-            "performance": {
-                "goals": "N/A",
-                "assists": "N/A",
-                "yellow_cards": "N/A",
-                "red_cards": "N/A"
-            },
-            "expected": {
-                "xg": "N/A",
-                "xag": "N/A"
-            },
-            "progression": {
-                "prgc": "N/A",
-                "prgp": "N/A",
-                "prgr": "N/A"
-            },
-            "per_90": {
-                "goals": "N/A",
-                "assists": "N/A",
-                "xg": "N/A",
-                "xag": "N/A"
-            },
-            "goalkeeping": {
-                "ga90": "N/A",
-                "save_pct": "N/A",
-                "cs_pct": "N/A",
-                "pen_save_pct": "N/A"
-            },
-            "shooting": {
-                "sot_pct": "N/A",
-                "sot_per90": "N/A",
-                "goals_per_shot": "N/A",
-                "avg_shot_dist": "N/A"
-            },
-            "passing": {
-                "total": {
-                    "completed": "N/A",
-                    "completion_pct": "N/A",
-                    "total_distance": "N/A"
-                },
-                "ranges": {
-                    "short_pct": "N/A",
-                    "medium_pct": "N/A",
-                    "long_pct": "N/A"
-                },
-                "expected": {
-                    "key_passes": "N/A",
-                    "final_third": "N/A",
-                    "penalty_area": "N/A",
-                    "crosses": "N/A",
-                    "progressive": "N/A"
-                }
-            },
-            "creation": {
-                "sca": "N/A",
-                "sca90": "N/A",
-                "gca": "N/A",
-                "gca90": "N/A"
-            },
-            "defense": {
-                "tackles": "N/A",
-                "tackles_won": "N/A",
-                "challenges": "N/A",
-                "challenges_lost": "N/A",
-                "blocks": "N/A",
-                "shot_blocks": "N/A",
-                "pass_blocks": "N/A",
-                "interceptions": "N/A"
-            },
-            "possession": {
-                "touches": {
-                    "total": "N/A",
-                    "def_pen": "N/A",
-                    "def_3rd": "N/A",
-                    "mid_3rd": "N/A",
-                    "att_3rd": "N/A",
-                    "att_pen": "N/A"
-                },
-                "take_ons": {
-                    "attempted": "N/A",
-                    "success_pct": "N/A",
-                    "tackled_pct": "N/A"
-                },
-                "carries": {
-                    "total": "N/A",
-                    "prog_distance": "N/A",
-                    "progressive": "N/A",
-                    "final_third": "N/A",
-                    "penalty_area": "N/A",
-                    "miscontrols": "N/A",
-                    "dispossessed": "N/A"
-                },
-                "receiving": {
-                    "received": "N/A",
-                    "progressive": "N/A"
-                }
-            },
-            "miscellaneous": {
-                "performance": {
-                    "fouls": "N/A",
-                    "fouled": "N/A",
-                    "offsides": "N/A",
-                    "crosses": "N/A",
-                    "recoveries": "N/A"
-                },
-                "aerials": {
-                    "won": "N/A",
-                    "lost": "N/A",
-                    "win_pct": "N/A"
-                }
-            }
-        }
-    
-    def extract_team_links(self, html):
-        soup = BeautifulSoup(html, 'html.parser')
-        results_table = soup.find('table', {'id': 'results2024-202591_overall'})
+    def extract_team_links(self, html, table_id='results2024-202591_overall'):
+        rows = extract_tables(self.parser, html, [table_id], key_stat='team').get(table_id)
         
-        if not results_table:
+        if not rows:
             raise ValueError("Results table not found")
             
-        team_links = {}
-        for row in results_table.find('tbody').find_all('tr'):
-            team_cell = row.find('td', {'data-stat': 'team'})
-            if team_cell and (a_tag := team_cell.find('a')):
-                team_links[a_tag.text.strip()] = f"{self.base_url}{a_tag['href']}"
-        
-        return team_links
+        return {cells['team']: f"{self.base_url}{cells['team_href']}" for cells in rows}
     
     def process_team_data(self, team_name, team_url):
         print(f"Processing {team_name}...")
@@ -186,456 +620,316 @@ class FootballDataScraper:
             print(f"Failed to fetch data for {team_name}")
             return
             
-        soup = BeautifulSoup(team_html, 'html.parser')
-        
-        with ThreadPoolExecutor() as executor:
-            executor.submit(self.process_standard_stats, soup, team_name)
-            executor.submit(self.process_goalkeeping_stats, soup)
-            executor.submit(self.process_shooting_stats, soup)
-            executor.submit(self.process_passing_stats, soup)
-            executor.submit(self.process_creation_stats, soup)
-            executor.submit(self.process_defensive_stats, soup)
-            executor.submit(self.process_possession_stats, soup)
-            executor.submit(self.process_miscellaneous_stats, soup)
-        
+        self.process_team_html(team_name, team_html)
+        self.save_checkpoint(team_url)
         print(f"Completed processing {team_name}")
-    
-    def process_standard_stats(self, soup, team_name):
-        table = soup.find('table', {'id': 'stats_standard_9'})
-        if not table:
-            return
-            
-        for row in table.find('tbody').find_all('tr'):
-            player_cell = row.find('th', {'data-stat': 'player'})
-            if not player_cell:
-                continue
-                
-            player_name = player_cell.find('a').text
-            if player_name not in self.player_data:
-                self.player_data[player_name] = self.initialize_player_record(player_name)
-                
-            player = self.player_data[player_name]
-            player['info']['team'] = team_name
-            
-            if (nation := row.find('td', {'data-stat': 'nationality'})):
-                nation_text = nation.text.strip()
-                player['info']['nation'] = nation_text.split()[-1] if ' ' in nation_text else nation_text
-                
-            if (position := row.find('td', {'data-stat': 'position'})):
-                player['info']['position'] = position.text
-                
-            if (age := row.find('td', {'data-stat': 'age'})):
-                player['info']['age'] = age.text
-                
-            if (matches := row.find('td', {'data-stat': 'games'})):
-                player['playing_time']['matches'] = matches.text
-                
-            if (starts := row.find('td', {'data-stat': 'games_starts'})):
-                player['playing_time']['starts'] = starts.text
-                
-            if (minutes := row.find('td', {'data-stat': 'minutes'})):
-                try:
-                    mins = int(minutes.text.strip().replace(',', ''))
-                    if mins >= 90:
-                        player['playing_time']['minutes'] = mins
-                    else:
-                        self.player_data.pop(player_name, None)
-                        continue
-                except (ValueError, AttributeError):
-                    self.player_data.pop(player_name, None)
-                    continue
-                    
-            if (goals := row.find('td', {'data-stat': 'goals'})):
-                player['performance']['goals'] = goals.text
-                
-            if (assists := row.find('td', {'data-stat': 'assists'})):
-                player['performance']['assists'] = assists.text
-                
-            if (yellows := row.find('td', {'data-stat': 'cards_yellow'})):
-                player['performance']['yellow_cards'] = yellows.text
-                
-            if (reds := row.find('td', {'data-stat': 'cards_red'})):
-                player['performance']['red_cards'] = reds.text
-                
-            if (xg := row.find('td', {'data-stat': 'xg'})):
-                player['expected']['xg'] = xg.text
-                
-            if (xag := row.find('td', {'data-stat': 'xg_assist'})):
-                player['expected']['xag'] = xag.text
-                
-            if (prgc := row.find('td', {'data-stat': 'progressive_carries'})):
-                player['progression']['prgc'] = prgc.text
-                
-            if (prgp := row.find('td', {'data-stat': 'progressive_passes'})):
-                player['progression']['prgp'] = prgp.text
-                
-            if (prgr := row.find('td', {'data-stat': 'progressive_passes_received'})):
-                player['progression']['prgr'] = prgr.text
-                
-            if (gls90 := row.find('td', {'data-stat': 'goals_per90'})):
-                player['per_90']['goals'] = gls90.text
-                
-            if (ast90 := row.find('td', {'data-stat': 'assists_per90'})):
-                player['per_90']['assists'] = ast90.text
-                
-            if (xg90 := row.find('td', {'data-stat': 'xg_per90'})):
-                player['per_90']['xg'] = xg90.text
-                
-            if (xag90 := row.find('td', {'data-stat': 'xg_assist_per90'})):
-                player['per_90']['xag'] = xag90.text
-    
-    def process_goalkeeping_stats(self, soup):
-        table = soup.find('table', {'id': 'stats_keeper_9'})
-        if not table:
+        
+    def load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
             return
             
-        for row in table.find('tbody').find_all('tr'):
-            player_cell = row.find('th', {'data-stat': 'player'})
-            if not player_cell:
-                continue
-                
-            player_name = player_cell.find('a').text
-            if player_name not in self.player_data:
-                continue
-                
-            player = self.player_data[player_name]
-            
-            if (ga90 := row.find('td', {'data-stat': 'gk_goals_against_per90'})):
-                player['goalkeeping']['ga90'] = ga90.text.strip()
-                
-            if (save_pct := row.find('td', {'data-stat': 'gk_save_pct'})):
-                player['goalkeeping']['save_pct'] = save_pct.text.strip()
-                
-            if (cs_pct := row.find('td', {'data-stat': 'gk_clean_sheets_pct'})):
-                player['goalkeeping']['cs_pct'] = cs_pct.text.strip()
-                
-            if (pen_save := row.find('td', {'data-stat': 'gk_pens_save_pct'})):
-                player['goalkeeping']['pen_save_pct'] = pen_save.text.strip()
-    
-    def process_shooting_stats(self, soup):
-        table = soup.find('table', {'id': 'stats_shooting_9'})
-        if not table:
+        try:
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            store = PlayerStore.from_dict(checkpoint['teams'])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable checkpoint {self.checkpoint_path}: {e}")
             return
             
-        for row in table.find('tbody').find_all('tr'):
-            player_cell = row.find('th', {'data-stat': 'player'})
-            if not player_cell:
-                continue
-                
-            player_name = player_cell.find('a').text
-            if player_name not in self.player_data:
-                continue
-                
-            player = self.player_data[player_name]
-            
-            if (sot_pct := row.find('td', {'data-stat': 'shots_on_target_pct'})):
-                player['shooting']['sot_pct'] = sot_pct.text.strip()
-                
-            if (sot90 := row.find('td', {'data-stat': 'shots_on_target_per90'})):
-                player['shooting']['sot_per90'] = sot90.text.strip()
-                
-            if (gps := row.find('td', {'data-stat': 'goals_per_shot'})):
-                player['shooting']['goals_per_shot'] = gps.text.strip()
-                
-            if (avg_dist := row.find('td', {'data-stat': 'average_shot_distance'})):
-                player['shooting']['avg_shot_dist'] = avg_dist.text.strip()
-    
-    def process_passing_stats(self, soup):
-        table = soup.find('table', {'id': 'stats_passing_9'})
-        if not table:
+        self.store = store
+        self.completed_teams = set(checkpoint['completed_teams'])
+        print(f"Resuming from checkpoint: {len(self.completed_teams)} teams already done")
+        
+    def save_checkpoint(self, team_url):
+        if not self.checkpoint_path:
             return
             
-        for row in table.find('tbody').find_all('tr'):
-            player_cell = row.find('th', {'data-stat': 'player'})
-            if not player_cell:
-                continue
-                
-            player_name = player_cell.find('a').text
-            if player_name not in self.player_data:
-                continue
-                
-            player = self.player_data[player_name]
+        with self.checkpoint_lock:
+            self.completed_teams.add(team_url)
+            checkpoint = {
+                'completed_teams': sorted(self.completed_teams),
+                'teams': self.store.to_dict()
+            }
+            tmp_path = f"{self.checkpoint_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(checkpoint, f, ensure_ascii=False)
+            os.replace(tmp_path, self.checkpoint_path)
             
-            if (cmp := row.find('td', {'data-stat': 'passes_completed'})):
-                player['passing']['total']['completed'] = cmp.text.strip()
-                
-            if (cmp_pct := row.find('td', {'data-stat': 'passes_pct'})):
-                player['passing']['total']['completion_pct'] = cmp_pct.text.strip()
-                
-            if (tot_dist := row.find('td', {'data-stat': 'passes_total_distance'})):
-                player['passing']['total']['total_distance'] = tot_dist.text.strip()
-                
-            if (short_pct := row.find('td', {'data-stat': 'passes_pct_short'})):
-                player['passing']['ranges']['short_pct'] = short_pct.text.strip()
-                
-            if (med_pct := row.find('td', {'data-stat': 'passes_pct_medium'})):
-                player['passing']['ranges']['medium_pct'] = med_pct.text.strip()
-                
-            if (long_pct := row.find('td', {'data-stat': 'passes_pct_long'})):
-                player['passing']['ranges']['long_pct'] = long_pct.text.strip()
-                
-            if (kp := row.find('td', {'data-stat': 'assisted_shots'})):
-                player['passing']['expected']['key_passes'] = kp.text.strip()
-                
-            if (final_third := row.find('td', {'data-stat': 'passes_into_final_third'})):
-                player['passing']['expected']['final_third'] = final_third.text.strip()
-                
-            if (pen_area := row.find('td', {'data-stat': 'passes_into_penalty_area'})):
-                player['passing']['expected']['penalty_area'] = pen_area.text.strip()
-                
-            if (crosses := row.find('td', {'data-stat': 'crosses_into_penalty_area'})):
-                player['passing']['expected']['crosses'] = crosses.text.strip()
-                
-            if (prog_passes := row.find('td', {'data-stat': 'progressive_passes'})):
-                player['passing']['expected']['progressive'] = prog_passes.text.strip()
-    
-    def process_creation_stats(self, soup):
-        table = soup.find('table', {'id': 'stats_gca_9'})
-        if not table:
-            return
+    def clear_checkpoint(self):
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        
+    def process_team_html(self, team_name, team_html):
+        self.store_team_result(team_name, parse_team_page(self.parser, team_name, team_html,
+                                                          known_hash=self.known_hash(team_name)))
+        
+    def store_team_result(self, team_name, result):
+        records, missing, elapsed, content_hash = result
+        if missing:
+            print(f"Tables not found for {team_name}: {', '.join(missing)}")
             
-        for row in table.find('tbody').find_all('tr'):
-            player_cell = row.find('th', {'data-stat': 'player'})
-            if not player_cell:
-                continue
-                
-            player_name = player_cell.find('a').text
-            if player_name not in self.player_data:
-                continue
-                
-            player = self.player_data[player_name]
+        if records is None:
+            print(f"{team_name} unchanged since last run, reusing previous records")
+            previous = self.previous_teams[team_name]
+            records = records_from_frame(self.previous_frame[self.previous_frame['Team'] == team_name])
+            records.update((record.key, record) for record in map(PlayerRecord.from_dict, previous['shadowed']))
             
-            if (sca := row.find('td', {'data-stat': 'sca'})):
-                player['creation']['sca'] = sca.text.strip()
-                
-            if (sca90 := row.find('td', {'data-stat': 'sca_per90'})):
-                player['creation']['sca90'] = sca90.text.strip()
-                
-            if (gca := row.find('td', {'data-stat': 'gca'})):
-                player['creation']['gca'] = gca.text.strip()
-                
-            if (gca90 := row.find('td', {'data-stat': 'gca_per90'})):
-                player['creation']['gca90'] = gca90.text.strip()
-    
-    def process_defensive_stats(self, soup):
-        table = soup.find('table', {'id': 'stats_defense_9'})
-        if not table:
+        self.store.add_team(team_name, records, content_hash)
+        self.record_timing('parsing', elapsed)
+        
+    def known_hash(self, team_name):
+        team = self.previous_teams.get(team_name) if self.previous_frame is not None else None
+        return team['content_hash'] if team else None
+        
+    def load_previous_snapshot(self):
+        if not self.incremental or not (manifest := read_manifest(self.manifest_path)):
             return
             
-        for row in table.find('tbody').find_all('tr'):
-            player_cell = row.find('th', {'data-stat': 'player'})
-            if not player_cell:
-                continue
-                
-            player_name = player_cell.find('a').text
-            if player_name not in self.player_data:
-                continue
-                
-            player = self.player_data[player_name]
-            
-            if (tkl := row.find('td', {'data-stat': 'tackles'})):
-                player['defense']['tackles'] = tkl.text.strip()
-                
-            if (tkl_won := row.find('td', {'data-stat': 'tackles_won'})):
-                player['defense']['tackles_won'] = tkl_won.text.strip()
-                
-            if (challenges := row.find('td', {'data-stat': 'challenges'})):
-                player['defense']['challenges'] = challenges.text.strip()
-                
-            if (challenges_lost := row.find('td', {'data-stat': 'challenges_lost'})):
-                player['defense']['challenges_lost'] = challenges_lost.text.strip()
-                
-            if (blocks := row.find('td', {'data-stat': 'blocks'})):
-                player['defense']['blocks'] = blocks.text.strip()
-                
-            if (shot_blocks := row.find('td', {'data-stat': 'blocked_shots'})):
-                player['defense']['shot_blocks'] = shot_blocks.text.strip()
-                
-            if (pass_blocks := row.find('td', {'data-stat': 'blocked_passes'})):
-                player['defense']['pass_blocks'] = pass_blocks.text.strip()
-                
-            if (interceptions := row.find('td', {'data-stat': 'interceptions'})):
-                player['defense']['interceptions'] = interceptions.text.strip()
-    
-    def process_possession_stats(self, soup):
-        table = soup.find('table', {'id': 'stats_possession_9'})
-        if not table:
+        try:
+            self.previous_frame = load_results(default_results_path())
+        except (OSError, ValueError) as e:
+            print(f"Previous snapshot unavailable, running a full scrape: {e}")
             return
             
-        for row in table.find('tbody').find_all('tr'):
-            player_cell = row.find('th', {'data-stat': 'player'})
-            if not player_cell:
-                continue
-                
-            player_name = player_cell.find('a').text
-            if player_name not in self.player_data:
-                continue
-                
-            player = self.player_data[player_name]
-            
-            if (touches := row.find('td', {'data-stat': 'touches'})):
-                player['possession']['touches']['total'] = touches.text.strip()
-                
-            if (def_pen := row.find('td', {'data-stat': 'touches_def_pen_area'})):
-                player['possession']['touches']['def_pen'] = def_pen.text.strip()
-                
-            if (def_3rd := row.find('td', {'data-stat': 'touches_def_3rd'})):
-                player['possession']['touches']['def_3rd'] = def_3rd.text.strip()
-                
-            if (mid_3rd := row.find('td', {'data-stat': 'touches_mid_3rd'})):
-                player['possession']['touches']['mid_3rd'] = mid_3rd.text.strip()
-                
-            if (att_3rd := row.find('td', {'data-stat': 'touches_att_3rd'})):
-                player['possession']['touches']['att_3rd'] = att_3rd.text.strip()
-                
-            if (att_pen := row.find('td', {'data-stat': 'touches_att_pen_area'})):
-                player['possession']['touches']['att_pen'] = att_pen.text.strip()
-                
-            if (take_ons := row.find('td', {'data-stat': 'take_ons'})):
-                player['possession']['take_ons']['attempted'] = take_ons.text.strip()
-                
-            if (success_pct := row.find('td', {'data-stat': 'take_ons_won_pct'})):
-                player['possession']['take_ons']['success_pct'] = success_pct.text.strip()
-                
-            if (tackled_pct := row.find('td', {'data-stat': 'take_ons_tackled_pct'})):
-                player['possession']['take_ons']['tackled_pct'] = tackled_pct.text.strip()
-                
-            if (carries := row.find('td', {'data-stat': 'carries'})):
-                player['possession']['carries']['total'] = carries.text.strip()
-                
-            if (prog_dist := row.find('td', {'data-stat': 'carries_progressive_distance'})):
-                player['possession']['carries']['prog_distance'] = prog_dist.text.strip()
-                
-            if (progressive := row.find('td', {'data-stat': 'progressive_carries'})):
-                player['possession']['carries']['progressive'] = progressive.text.strip()
-                
-            if (final_third := row.find('td', {'data-stat': 'carries_into_final_third'})):
-                player['possession']['carries']['final_third'] = final_third.text.strip()
-                
-            if (pen_area := row.find('td', {'data-stat': 'carries_into_penalty_area'})):
-                player['possession']['carries']['penalty_area'] = pen_area.text.strip()
-                
-            if (miscontrols := row.find('td', {'data-stat': 'miscontrols'})):
-                player['possession']['carries']['miscontrols'] = miscontrols.text.strip()
-                
-            if (dispossessed := row.find('td', {'data-stat': 'dispossessed'})):
-                player['possession']['carries']['dispossessed'] = dispossessed.text.strip()
-                
-            if (received := row.find('td', {'data-stat': 'passes_received'})):
-                player['possession']['receiving']['received'] = received.text.strip()
-                
-            if (prog_received := row.find('td', {'data-stat': 'progressive_passes_received'})):
-                player['possession']['receiving']['progressive'] = prog_received.text.strip()
-    
-    def process_miscellaneous_stats(self, soup):
-        table = soup.find('table', {'id': 'stats_misc_9'})
-        if not table:
+        if 'PlayerID' not in self.previous_frame.columns:
+            print("Previous snapshot has no player ids, running a full scrape")
+            self.previous_frame = None
             return
             
-        for row in table.find('tbody').find_all('tr'):
-            player_cell = row.find('th', {'data-stat': 'player'})
-            if not player_cell:
-                continue
-                
-            player_name = player_cell.find('a').text
-            if player_name not in self.player_data:
-                continue
-                
-            player = self.player_data[player_name]
-            
-            if (fouls := row.find('td', {'data-stat': 'fouls'})):
-                player['miscellaneous']['performance']['fouls'] = fouls.text.strip()
-                
-            if (fouled := row.find('td', {'data-stat': 'fouled'})):
-                player['miscellaneous']['performance']['fouled'] = fouled.text.strip()
-                
-            if (offsides := row.find('td', {'data-stat': 'offsides'})):
-                player['miscellaneous']['performance']['offsides'] = offsides.text.strip()
-                
-            if (crosses := row.find('td', {'data-stat': 'crosses'})):
-                player['miscellaneous']['performance']['crosses'] = crosses.text.strip()
-                
-            if (recoveries := row.find('td', {'data-stat': 'ball_recoveries'})):
-                player['miscellaneous']['performance']['recoveries'] = recoveries.text.strip()
+        teams = manifest.get('teams', {})
+        self.previous_teams = {team_name: team for team_name, team in teams.items() if isinstance(team, dict)}
+        self.previous_hashes = {team_name: team['content_hash'] if isinstance(team, dict) else team
+                                for team_name, team in teams.items()}
+        self.previous_snapshot = manifest.get('snapshot')
             
-            if (aerials_won := row.find('td', {'data-stat': 'aerials_won'})):
-                player['miscellaneous']['aerials']['won'] = aerials_won.text.strip()
-                
-            if (aerials_lost := row.find('td', {'data-stat': 'aerials_lost'})):
-                player['miscellaneous']['aerials']['lost'] = aerials_lost.text.strip()
-                
-            if (aerial_win_pct := row.find('td', {'data-stat': 'aerials_won_pct'})):
-                player['miscellaneous']['aerials']['win_pct'] = aerial_win_pct.text.strip()
-    
-    def flatten_player_data(self):
-        flat_data = []
-        
-        for player_name, stats in self.player_data.items():
-            flat_record = {
-                'Name': player_name,
-                'Team': stats['info']['team'],
-                'Nation': stats['info']['nation'],
-                'Position': stats['info']['position'],
-                'Age': stats['info']['age']
+        self.previous_frame[INFO_COLUMNS] = self.previous_frame[INFO_COLUMNS].fillna('N/A').astype(str)
+        print(f"Loaded previous snapshot of {len(self.previous_hashes)} teams")
+        
+    def save_manifest(self):
+        hashes = self.store.content_hashes()
+        snapshot = hashlib.sha1(json.dumps(hashes, sort_keys=True).encode('utf-8')).hexdigest()
+        players = self.store.merged()
+        manifest = {
+            'snapshot': snapshot,
+            'previous_snapshot': self.previous_snapshot if self.previous_frame is not None else None,
+            'teams': {
+                team_name: {
+                    'content_hash': team['content_hash'],
+                    'shadowed': [record.to_dict() for key, record in team['records'].items()
+                                 if players[key] is not record]
+                }
+                for team_name, team in self.store.snapshot().items()
             }
+        }
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
             
-            for category, values in stats.items():
-                if category == 'info':
-                    continue
-                    
-                if isinstance(values, dict):
-                    for subcat, subvalues in values.items():
-                        if isinstance(subvalues, dict):
-                            for key, value in subvalues.items():
-                                flat_record[f"{category}_{subcat}_{key}"] = value
-                        else:
-                            flat_record[f"{category}_{subcat}"] = subvalues
+    def export_delta(self):
+        if not self.incremental or self.previous_frame is None:
+            if os.path.exists(self.delta_path):
+                os.remove(self.delta_path)
+            return
             
-            flat_data.append(flat_record)
-        
-        return flat_data
+        hashes = self.store.content_hashes()
+        changed_teams = {team_name for team_name in hashes.keys() | self.previous_hashes.keys()
+                         if hashes.get(team_name) != self.previous_hashes.get(team_name)}
+        delta = compute_delta(self.previous_frame, self.to_dataframe(), changed_teams)
+        write_results_csv(delta, self.delta_path)
+        print(f"Delta of {len(delta)} player rows from {len(changed_teams)} changed teams "
+              f"exported to {self.delta_path}")
+    
+    def to_dataframe(self):
+        return build_results_frame(self.player_data)
     
     def export_to_csv(self, filename='results.csv'):
-        if not self.player_data:
+        players = self.player_data
+        if not players:
             print("No player data to export")
             return
             
-        flat_data = self.flatten_player_data()
-        df = pd.DataFrame(flat_data)
-        
-        basic_cols = ['Name', 'Team', 'Nation', 'Position', 'Age']
-        other_cols = [col for col in df.columns if col not in basic_cols]
-        df = df[basic_cols + other_cols]
-        
-        df = df.sort_values(by='Name')
-        
-        df.to_csv(filename, index=False, encoding='utf-8-sig')
+        write_results_csv(build_results_frame(players), filename)
         print(f"Data successfully exported to {filename} (sorted by player name)")
+        
+    def export_to_arrow(self, filename='results.arrow'):
+        players = self.player_data
+        if players and write_results_arrow(build_results_frame(players), filename):
+            print(f"Data successfully exported to {filename}")
     
     def run(self):
         print("Starting football data scraper...")
+        started = time.perf_counter()
+        self.load_checkpoint()
+        self.load_previous_snapshot()
         
-        main_html = self.fetch_page(self.base_url + "/en/")
+        team_links = self.pending_team_links(self.fetch_page(self.base_url + "/en/"))
+        if team_links is None:
+            return
+            
+        total_teams = len(team_links)
+        if self.pipeline:
+            self.process_teams_pipelined(team_links)
+        elif self.max_concurrency > 1:
+            self.process_teams_concurrently(team_links)
+        else:
+            for i, (team_name, team_url) in enumerate(team_links.items(), 1):
+                print(f"\nProcessing team {i}/{total_teams}: {team_name}")
+                self.process_team_data(team_name, team_url)
+            
+        self.finish_run(team_links, started)
+        
+    def pending_team_links(self, main_html):
         if not main_html:
             print("Failed to fetch main page")
-            return
+            return None
             
         try:
             team_links = self.extract_team_links(main_html)
             print(f"Found {len(team_links)} teams to process")
         except Exception as e:
             print(f"Error extracting team links: {e}")
-            return
-            
-        total_teams = len(team_links)
-        for i, (team_name, team_url) in enumerate(team_links.items(), 1):
-            print(f"\nProcessing team {i}/{total_teams}: {team_name}")
-            self.process_team_data(team_name, team_url)
+            return None
             
+        team_links = {team_name: team_url for team_name, team_url in team_links.items()
+                      if team_url not in self.completed_teams}
+        if self.completed_teams:
+            print(f"{len(team_links)} teams left after checkpoint")
+        return team_links
+        
+    def finish_run(self, team_links, started):
         self.export_to_csv()
+        self.export_to_arrow()
+        if self.player_data:
+            self.export_delta()
+            self.save_manifest()
+        if all(team_url in self.completed_teams for team_url in team_links.values()):
+            self.clear_checkpoint()
         
         print("\nScraping completed!")
+        self.report_timings(time.perf_counter() - started)
+        if self.cache:
+            self.cache.flush()
+            print(self.cache.summary())
+        
+    def process_teams_concurrently(self, team_links):
+        total_teams = len(team_links)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = {
+                executor.submit(self.process_team_data, team_name, team_url): team_name
+                for team_name, team_url in team_links.items()
+            }
+            for i, future in enumerate(as_completed(futures), 1):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error processing {futures[future]}: {e}")
+                print(f"Finished team {i}/{total_teams}: {futures[future]}")
+                
+    def process_teams_pipelined(self, team_links):
+        total_teams = len(team_links)
+        html_queue = queue.Queue(maxsize=self.queue_size)
+        parse_slots = threading.BoundedSemaphore(self.parse_workers)
+        finished = []
+        
+        def fetch(team_name, team_url):
+            team_html = None
+            try:
+                print(f"Fetching {team_name}...")
+                team_html = self.fetch_page(team_url)
+            finally:
+                html_queue.put((team_name, team_url, team_html))
+                
+        def finish(team_name, team_url, future):
+            parse_slots.release()
+            try:
+                self.store_team_result(team_name, future.result())
+                self.save_checkpoint(team_url)
+            except Exception as e:
+                print(f"Error parsing {team_name}: {e}")
+                return
+            finished.append(team_name)
+            print(f"Finished team {len(finished)}/{total_teams}: {team_name}")
+            
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as fetch_pool, \
+             ProcessPoolExecutor(max_workers=self.parse_workers) as parse_pool:
+            for team_name, team_url in team_links.items():
+                fetch_pool.submit(fetch, team_name, team_url)
+                
+            for _ in range(total_teams):
+                team_name, team_url, team_html = html_queue.get()
+                if not team_html:
+                    print(f"Failed to fetch data for {team_name}")
+                    continue
+                    
+                parse_slots.acquire()
+                future = parse_pool.submit(parse_team_page, self.parser, team_name, team_html,
+                                           known_hash=self.known_hash(team_name))
+                future.add_done_callback(partial(finish, team_name, team_url))
+                
+    def report_timings(self, elapsed):
+        mean_delay = sum(self.request_delay) / 2
+        serial_estimate = (self.timings['requests'] * mean_delay
+                           + self.timings['network'] + self.timings['parsing'])
+        saved = serial_estimate - elapsed
+        
+        print(f"Requests: {self.timings['requests']}, network: {self.timings['network']:.1f}s, "
+              f"parsing: {self.timings['parsing']:.1f}s")
+        print(f"Wall clock: {elapsed:.1f}s, estimated serial path: {serial_estimate:.1f}s")
+        if serial_estimate > 0:
+            print(f"Saved {saved:.1f}s ({saved / serial_estimate:.0%}) against the serial path")
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="FBref Premier League player scraper")
+    parser.add_argument('--max-concurrency', type=int, default=1,
+                        help="number of team pages fetched in flight at once")
+    parser.add_argument('--requests-per-second', type=float, default=None,
+                        help="global rate limit shared by all workers (default: one request per mean "
+                             "delay when concurrent, otherwise a random delay between requests)")
+    parser.add_argument('--parser', choices=available_parsers(), default=None,
+                        help="HTML parsing backend (default: fastest installed)")
+    parser.add_argument('--cache-dir', default='.http_cache',
+                        help="directory of the on-disk HTTP response cache")
+    parser.add_argument('--cache-ttl', type=float, default=6,
+                        help="hours before a cached page is revalidated with the server")
+    parser.add_argument('--cache-size', type=int, default=200,
+                        help="maximum cache size in MB (least recently used pages are evicted)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="always download pages from the network")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="overlap fetching with parsing in a separate process pool")
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help="parser processes used by --pipeline (default: CPU count)")
+    parser.add_argument('--queue-size', type=int, default=4,
+                        help="downloaded pages allowed to wait for a parser before fetching pauses")
+    parser.add_argument('--incremental', action='store_true',
+                        help="reuse unchanged teams from the previous results and export only changed rows")
+    parser.add_argument('--checkpoint', default='scrape_checkpoint.json',
+                        help="file used to resume an interrupted run")
+    parser.add_argument('--fresh', action='store_true',
+                        help="discard any existing checkpoint and start over")
+    return parser
+
+def parse_args():
+    return build_arg_parser().parse_args()
+
+def scraper_options(args):
+    cache = None if args.no_cache else HttpCache(args.cache_dir,
+                                                 max_bytes=args.cache_size * 1024 * 1024,
+                                                 ttl=args.cache_ttl * 3600)
+    return {
+        'max_concurrency': args.max_concurrency,
+        'requests_per_second': args.requests_per_second,
+        'parser': args.parser,
+        'cache': cache,
+        'checkpoint_path': args.checkpoint,
+        'pipeline': args.pipeline,
+        'parse_workers': args.parse_workers,
+        'queue_size': args.queue_size,
+        'incremental': args.incremental
+    }
 
 if __name__ == "__main__":
-    scraper = FootballDataScraper()
+    args = parse_args()
+    scraper = FootballDataScraper(**scraper_options(args))
+    if args.fresh:
+        scraper.clear_checkpoint()
     scraper.run()
\ No newline at end of file
@@ -1,6 +1,10 @@
+import argparse
+import json
+import os
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Optional, Union
+from typing import List, Dict, Optional, Tuple, Union
+from data_loader import load_results, default_results_path, applicable_delta, current_snapshot, player_keys
 
 def parse_age_string(age_str: str) -> Optional[float]:
     if not isinstance(age_str, str):
@@ -12,20 +16,19 @@ def parse_age_string(age_str: str) -> Optional[float]:
         return None
 
 def load_and_clean_data(file_path: str) -> pd.DataFrame:
-    data = pd.read_csv(file_path)
-    data.replace(["N/a"], np.nan, inplace=True)
-    return data
+    return load_results(file_path)
 
 def prepare_statistical_data(data: pd.DataFrame) -> pd.DataFrame:
     df = data.copy()
     df['AgeString'] = df['Age'] 
     df['Age'] = df['Age'].apply(parse_age_string)
     
-    non_stat_columns = ["Name", "Team", "Nation", "Position", "AgeString"]
+    non_stat_columns = ["Name", "PlayerID", "Team", "Nation", "Position", "AgeString"]
     stat_columns = [col for col in df.columns if col not in non_stat_columns]
     
     for col in stat_columns:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
     
     return df, non_stat_columns, stat_columns
 
@@ -46,53 +49,130 @@ def generate_metric_header(col_widths: Dict[str, int], metric: str) -> str:
         f"{metric}"
     )
 
-
-def format_data_row(row: pd.Series, col_widths: Dict[str, int], column: str) -> str:
-    display_value = row['AgeString'] if column == 'Age' else f"{row[column]:.2f}"
-    return (
-        f"{row['Name']:<{col_widths['Name']}} "
-        f"{row['Nation']:<{col_widths['Nation']}} "
-        f"{row['Team']:<{col_widths['Team']}} "
-        f"{row['Position']:<{col_widths['Position']}} "
+def format_rows(rows: pd.DataFrame, col_widths: Dict[str, int], column: str) -> List[str]:
+    values = rows['AgeString'].tolist() if column == 'Age' else [f"{value:.2f}" for value in rows[column].tolist()]
+    return [
+        f"{name:<{col_widths['Name']}} "
+        f"{nation:<{col_widths['Nation']}} "
+        f"{team:<{col_widths['Team']}} "
+        f"{position:<{col_widths['Position']}} "
         f"{display_value}"
-    )
+        for name, nation, team, position, display_value in zip(
+            rows['Name'].tolist(), rows['Nation'].tolist(), rows['Team'].tolist(),
+            rows['Position'].tolist(), values)
+    ]
 
-def process_metric(
+def extreme_indices(values: np.ndarray, k: int, largest: bool = True) -> List[np.ndarray]:
+    valid = ~np.isnan(values)
+    keys = np.where(valid, values if largest else -values, -np.inf)
+    counts = valid.sum(axis=0)
+    
+    n_rows = len(values)
+    if n_rows == 0:
+        return [np.empty(0, dtype=int) for _ in range(values.shape[1])]
+    
+    cutoff = min(k, n_rows)
+    thresholds = np.partition(keys, n_rows - cutoff, axis=0)[n_rows - cutoff]
+    
+    selected = []
+    for j in range(values.shape[1]):
+        rows = np.flatnonzero(valid[:, j] & (keys[:, j] >= thresholds[j]))
+        order = np.lexsort((rows, -keys[rows, j]))
+        selected.append(rows[order[:min(k, counts[j])]])
+    return selected
+
+def select_all_extremes(
     df: pd.DataFrame,
-    metric: str,
+    metrics: List[str],
     display_cols: List[str],
-    col_widths: Dict[str, int]
-) -> List[str]:
-    output_lines = []
+    k: int = 3
+) -> Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]:
+    metrics = [metric for metric in metrics
+               if metric in df.columns and pd.api.types.is_numeric_dtype(df[metric])]
+    if not metrics:
+        return {}
     
-    if metric not in df.columns or not pd.api.types.is_numeric_dtype(df[metric]):
-        return output_lines
+    values = df[metrics].to_numpy(dtype=float)
+    top_rows = extreme_indices(values, k, largest=True)
+    bottom_rows = extreme_indices(values, k, largest=False)
+    info = {col: df[col].to_numpy(dtype=object) for col in display_cols + ['AgeString']}
+    index = df.index.to_numpy()
     
-    cols_needed = display_cols + ['AgeString'] if metric == 'Age' else display_cols + [metric]
-    valid_data = df[cols_needed].dropna(subset=[metric])
+    def build_frame(rows, metric, j):
+        columns = {col: column[rows] for col, column in info.items()}
+        columns[metric] = values[rows, j]
+        return pd.DataFrame(columns, index=index[rows])
     
-    if valid_data.empty:
-        return output_lines
-    
-    try:
-        top_performers = valid_data.nlargest(3, metric)
-        bottom_performers = valid_data.nsmallest(3, metric)
-    except Exception as e:
-        print(f"Error processing {metric}: {e}")
-        return output_lines
+    extremes = {}
+    for j, metric in enumerate(metrics):
+        if len(top_rows[j]) == 0:
+            continue
+        extremes[metric] = (build_frame(top_rows[j], metric, j), build_frame(bottom_rows[j], metric, j))
+    return extremes
+
+def select_extremes(
+    df: pd.DataFrame,
+    metric: str,
+    display_cols: List[str],
+    k: int = 3
+) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+    return select_all_extremes(df, [metric], display_cols, k).get(metric)
+
+def player_key_column(df: pd.DataFrame) -> str:
+    return 'PlayerID' if 'PlayerID' in df.columns else 'Name'
+
+def report_columns(df: pd.DataFrame) -> List[str]:
+    return ["Name", "Nation", "Team", "Position", "Age"] + (["PlayerID"] if "PlayerID" in df.columns else [])
+
+def merge_extremes(
+    previous: pd.DataFrame,
+    candidates: pd.DataFrame,
+    metric: str,
+    touched: set,
+    largest: bool,
+    k: int = 3
+) -> Optional[pd.DataFrame]:
+    key = player_key_column(previous)
+    kept = previous[~player_keys(previous).isin(touched)]
+    if len(kept) < len(previous):
+        return None
     
+    merged = pd.concat([kept, candidates[previous.columns].dropna(subset=[metric])])
+    order = [metric, 'Name'] + (['PlayerID'] if key == 'PlayerID' else [])
+    return merged.sort_values(order, ascending=[not largest] + [True] * (len(order) - 1), kind='mergesort').head(k)
+
+def render_metric(
+    metric: str,
+    top_performers: pd.DataFrame,
+    bottom_performers: pd.DataFrame,
+    col_widths: Dict[str, int],
+    k: int = 3
+) -> List[str]:
+    output_lines = []
     output_lines.append(f"╞{'═'*40} {metric} {'═'*40}╡")
-    output_lines.append("TOP 3:")
+    output_lines.append(f"TOP {k}:")
     output_lines.append(generate_metric_header(col_widths, metric))
-    output_lines.extend(format_data_row(row, col_widths, metric) for _, row in top_performers.iterrows())
+    output_lines.extend(format_rows(top_performers, col_widths, metric))
     
-    output_lines.append("BOTTOM 3:")
+    output_lines.append(f"BOTTOM {k}:")
     output_lines.append(generate_metric_header(col_widths, metric))
-    output_lines.extend(format_data_row(row, col_widths, metric) for _, row in bottom_performers.iterrows())
+    output_lines.extend(format_rows(bottom_performers, col_widths, metric))
     output_lines.append('-' * 98)
     
     return output_lines
 
+def process_metric(
+    df: pd.DataFrame,
+    metric: str,
+    display_cols: List[str],
+    col_widths: Dict[str, int],
+    k: int = 3
+) -> List[str]:
+    extremes = select_extremes(df, metric, display_cols, k)
+    if extremes is None:
+        return []
+    return render_metric(metric, *extremes, col_widths, k)
+
 def save_report(content: List[str], filename: str) -> bool:
     try:
         with open(filename, 'w', encoding='utf-8') as f:
@@ -102,29 +182,135 @@ def save_report(content: List[str], filename: str) -> bool:
         print(f"Error saving report: {e}")
         return False
 
-def generate_performance_report(input_file: str, output_file: str) -> None:
-    raw_data = load_and_clean_data(input_file)
-    processed_data, id_columns, stat_columns = prepare_statistical_data(raw_data)
-    
+def render_report(extremes: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]], k: int = 3) -> List[str]:
     column_widths = initialize_output_format()
-    display_columns = ["Name", "Nation", "Team", "Position", "Age"]
     report_content = []
     
-    for metric in stat_columns:
-        metric_results = process_metric(
-            processed_data,
-            metric,
-            display_columns,
-            column_widths
-        )
-        if metric_results:
-            report_content.extend(metric_results)
-            report_content.append('')
-    
-    if save_report(report_content, output_file):
+    for metric, (top_performers, bottom_performers) in extremes.items():
+        report_content.extend(render_metric(metric, top_performers, bottom_performers, column_widths, k))
+        report_content.append('')
+    
+    return report_content
+
+def render_grouped_report(
+    grouped: Dict[str, Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]],
+    group_by: str,
+    k: int = 3
+) -> List[str]:
+    report_content = []
+    for group, extremes in grouped.items():
+        report_content.append(f"{group_by}: {group}")
+        report_content.append('=' * 98)
+        report_content.extend(render_report(extremes, k))
+    return report_content
+
+def save_extremes_state(extremes: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]], state_file: str, k: int = 3) -> None:
+    state = {
+        'snapshot': current_snapshot(),
+        'k': k,
+        'metrics': {metric: {'columns': list(top.columns),
+                             'top': top.to_dict('records'),
+                             'bottom': bottom.to_dict('records')}
+                    for metric, (top, bottom) in extremes.items()}
+    }
+    with open(state_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+
+def load_extremes_state(state_file: str) -> Tuple[Optional[str], int, Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]]:
+    with open(state_file, encoding='utf-8') as f:
+        state = json.load(f)
+    
+    extremes = {metric: (pd.DataFrame(entry['top'], columns=entry['columns']),
+                         pd.DataFrame(entry['bottom'], columns=entry['columns']))
+                for metric, entry in state['metrics'].items()}
+    return state.get('snapshot'), state.get('k', 3), extremes
+
+def write_report(extremes: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]], output_file: str,
+                 state_file: Optional[str], k: int = 3) -> None:
+    if save_report(render_report(extremes, k), output_file):
+        if state_file:
+            save_extremes_state(extremes, state_file, k)
         print(f"Performance report successfully saved to {output_file}")
     else:
         print("Failed to save performance report")
 
+def generate_performance_report(input_file: str, output_file: str, state_file: Optional[str] = None,
+                                k: int = 3, group_by: Optional[str] = None) -> None:
+    raw_data = load_and_clean_data(input_file)
+    processed_data, id_columns, stat_columns = prepare_statistical_data(raw_data)
+    display_columns = report_columns(processed_data)
+    
+    if group_by is None:
+        extremes = select_all_extremes(processed_data, stat_columns, display_columns, k)
+        return write_report(extremes, output_file, state_file, k)
+    
+    if group_by not in processed_data.columns:
+        raise ValueError(f"Cannot group by '{group_by}': column not found")
+    
+    grouped = {
+        group: select_all_extremes(processed_data.iloc[rows], stat_columns, display_columns, k)
+        for group, rows in processed_data.groupby(group_by, sort=True).indices.items()
+    }
+    if save_report(render_grouped_report(grouped, group_by, k), output_file):
+        print(f"Performance report by {group_by} successfully saved to {output_file}")
+    else:
+        print("Failed to save performance report")
+
+def update_performance_report(input_file: str, delta_file: str, output_file: str, state_file: str) -> None:
+    _, k, previous = load_extremes_state(state_file)
+    delta = load_and_clean_data(delta_file)
+    touched = set(player_keys(delta))
+    upserts, _, stat_columns = prepare_statistical_data(delta[delta['Change'] == 'upsert'].drop(columns='Change'))
+    
+    extremes = {}
+    stale = []
+    for metric in stat_columns:
+        merged = None
+        if metric in previous:
+            top, bottom = previous[metric]
+            merged = (merge_extremes(top, upserts, metric, touched, largest=True, k=k),
+                      merge_extremes(bottom, upserts, metric, touched, largest=False, k=k))
+        
+        if merged is None or merged[0] is None or merged[1] is None:
+            stale.append(metric)
+            merged = None
+        extremes[metric] = merged
+    
+    if stale:
+        full_data, _, _ = prepare_statistical_data(load_and_clean_data(input_file))
+        recomputed = select_all_extremes(full_data, stale, report_columns(full_data), k)
+        extremes.update({metric: recomputed.get(metric) for metric in stale})
+    extremes = {metric: result for metric, result in extremes.items() if result is not None}
+    
+    print(f"Applied {len(touched)} changed players, {len(stale)} metrics recomputed from the full dataset")
+    write_report(extremes, output_file, state_file, k)
+
+def run_report(input_file: str, output_file: str = "top_3.txt", state_file: str = "top_3_state.json",
+               k: int = 3, group_by: Optional[str] = None) -> None:
+    if group_by is not None:
+        return generate_performance_report(input_file, output_file, k=k, group_by=group_by)
+    
+    if os.path.exists(output_file) and os.path.exists(state_file):
+        snapshot, state_k, _ = load_extremes_state(state_file)
+        if state_k == k and snapshot and snapshot == current_snapshot():
+            print(f"{output_file} is up to date")
+            return
+        if state_k == k and (delta_file := applicable_delta(snapshot)):
+            return update_performance_report(input_file, delta_file, output_file, state_file)
+    
+    generate_performance_report(input_file, output_file, state_file, k)
+
 if __name__ == "__main__":
-    generate_performance_report("results.csv", "top_3.txt")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Top and bottom players for every statistic")
+    parser.add_argument('--top', type=int, default=3, help="players listed at each end of every statistic")
+    parser.add_argument('--group-by', choices=['Team', 'Position', 'Nation'],
+                        help="report the extremes separately within each team, position or nation")
+    parser.add_argument('--output', help="report file (default top_<k>.txt, or top_<k>_by_<group>.txt)")
+    args = parser.parse_args()
+    
+    if args.top < 1:
+        parser.error("--top must be at least 1")
+    
+    suffix = f"_by_{args.group_by.lower()}" if args.group_by else ''
+    output_file = args.output or f"top_{args.top}{suffix}.txt"
+    run_report(default_results_path(), output_file, f"top_{args.top}_state.json", args.top, args.group_by)
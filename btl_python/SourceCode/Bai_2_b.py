@@ -1,6 +1,9 @@
+import argparse
+import os
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Tuple, Union
+from data_loader import load_results, iter_results, default_results_path, applicable_delta, current_snapshot
 
 def convert_age_to_years(age_str: Union[str, float]) -> float:
     if pd.isna(age_str) or not isinstance(age_str, str):
@@ -12,55 +15,388 @@ def convert_age_to_years(age_str: Union[str, float]) -> float:
     except (ValueError, AttributeError):
         return np.nan
 
-def load_and_preprocess_data(filepath: str) -> pd.DataFrame:
-    df = pd.read_csv(filepath)
-    df.replace(['N/A'], np.nan, inplace=True)
-    
+def preprocess_chunk(df: pd.DataFrame) -> pd.DataFrame:
     if 'Age' in df.columns:
-        df['Age'] = df['Age'].apply(convert_age_to_years)
+        df['Age'] = df['Age'].apply(convert_age_to_years).astype(float)
     
     return df
 
+def load_and_preprocess_data(filepath: str) -> pd.DataFrame:
+    return preprocess_chunk(load_results(filepath))
+
 def get_column_categories(df: pd.DataFrame) -> Dict[str, List[str]]:
-    non_stat_cols = ["Name", "Nation", "Team", "Position"]
+    non_stat_cols = ["Name", "PlayerID", "Nation", "Team", "Position"]
     stat_cols = [col for col in df.columns 
                 if col not in non_stat_cols 
                 and pd.api.types.is_numeric_dtype(df[col])]
     
     return {'statistical': stat_cols, 'non_statistical': non_stat_cols}
 
-def compute_aggregates(df: pd.DataFrame, stat_cols: List[str], group_col: str = None) -> pd.DataFrame:
-    metrics = ['mean', 'median', 'std']
+STAT_METRICS = ['mean', 'median', 'std']
+
+def empty_moments(n_groups: int, n_cols: int) -> Dict[str, np.ndarray]:
+    return {key: np.zeros((n_groups, n_cols)) for key in ('count', 'mean', 'm2')}
+
+def group_sums(values: np.ndarray, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    n_cols = values.shape[1]
+    cells = (codes[:, None] * n_cols + np.arange(n_cols)).ravel()
+    return np.bincount(cells, weights=values.ravel(), minlength=n_groups * n_cols).reshape(n_groups, n_cols)
+
+def block_moments(block: np.ndarray, codes: np.ndarray, n_groups: int) -> Dict[str, np.ndarray]:
+    grouped = codes >= 0
+    block, codes = block[grouped], codes[grouped]
+    valid = ~np.isnan(block)
+    filled = np.where(valid, block, 0.0)
     
-    if group_col:
-        agg_df = df.groupby(group_col)[stat_cols].agg(metrics)
-        agg_df.columns = [f"{metric.capitalize()} of {col}" 
-                         for col, metric in agg_df.columns]
-    else:
-        agg_df = pd.DataFrame(
-            {f"{metric.capitalize()} of {col}": df[col].agg(metric)
-             for col in stat_cols for metric in metrics},
-            index=['All']
-        )
+    count = group_sums(valid.astype(float), codes, n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nan_to_num(group_sums(filled, codes, n_groups) / count)
+    deviations = np.where(valid, filled - mean[codes], 0.0)
+    
+    return {'count': count, 'mean': mean, 'm2': group_sums(deviations ** 2, codes, n_groups)}
+
+def merge_moments(left: Dict[str, np.ndarray], right: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    n = left['count'] + right['count']
+    delta = right['mean'] - left['mean']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weight = np.where(n > 0, right['count'] / n, 0.0)
+    
+    return {
+        'count': n,
+        'mean': left['mean'] + delta * weight,
+        'm2': left['m2'] + right['m2'] + delta ** 2 * left['count'] * weight
+    }
+
+def finalize_moments(moments: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    count = moments['count']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(count > 0, moments['mean'], np.nan)
+        std = np.where(count > 1, np.sqrt(moments['m2'] / (count - 1)), np.nan)
+    return mean, std
+
+def column_medians(values: np.ndarray) -> np.ndarray:
+    ordered = np.sort(values, axis=0)
+    count = (~np.isnan(ordered)).sum(axis=0)
+    columns = np.arange(values.shape[1])
+    lower = ordered[np.maximum(count - 1, 0) // 2, columns]
+    upper = ordered[np.minimum(count // 2, len(ordered) - 1), columns]
+    return np.where(count > 0, (lower + upper) / 2, np.nan)
+
+def group_medians(values: np.ndarray, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    medians = np.full((n_groups, values.shape[1]), np.nan)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(n_groups + 1))
     
+    for group in range(n_groups):
+        if bounds[group] < bounds[group + 1]:
+            medians[group] = column_medians(values[order[bounds[group]:bounds[group + 1]]])
+    return medians
+
+def grouped_statistics(df: pd.DataFrame, stat_cols: List[str], group_cols: List[str],
+                       block_rows: int = 16384) -> Dict[Optional[str], Dict[str, np.ndarray]]:
+    values = np.ascontiguousarray(df[stat_cols].to_numpy(dtype=float))
+    groupings = {None: (np.zeros(len(df), dtype=np.intp), np.array(['All']))}
+    for col in group_cols:
+        codes, labels = pd.factorize(df[col], sort=True)
+        groupings[col] = (codes, np.asarray(labels, dtype=str))
+    
+    moments = {key: empty_moments(len(labels), len(stat_cols)) for key, (_, labels) in groupings.items()}
+    for start in range(0, len(values), block_rows):
+        block = values[start:start + block_rows]
+        for key, (codes, labels) in groupings.items():
+            block_state = block_moments(block, codes[start:start + block_rows], len(labels))
+            moments[key] = merge_moments(moments[key], block_state)
+    
+    for key, (codes, labels) in groupings.items():
+        moments[key]['labels'] = labels
+        moments[key]['median'] = group_medians(values, codes, len(labels))
+    return moments
+
+def statistics_frame(stats: Dict[str, np.ndarray], stat_cols: List[str]) -> pd.DataFrame:
+    mean, std = finalize_moments(stats)
+    table = np.stack([mean, stats['median'], std], axis=2).reshape(len(stats['labels']), -1)
+    columns = [f"{metric.capitalize()} of {col}" for col in stat_cols for metric in STAT_METRICS]
+    return pd.DataFrame(table, index=pd.Index(stats['labels'], dtype=object), columns=columns)
+
+class QuantileSketch:
+    def __init__(self, n_groups: int, n_cols: int, relative_accuracy: float = 0.01,
+                 min_value: float = 1e-3, max_value: float = 1e6):
+        self.log_gamma = np.log((1 + relative_accuracy) / (1 - relative_accuracy))
+        self.offset = int(np.floor(np.log(min_value) / self.log_gamma))
+        self.n_bins = int(np.ceil(np.log(max_value) / self.log_gamma)) - self.offset
+        self.min_value = min_value
+        self.n_groups, self.n_cols, self.n_keys = n_groups, n_cols, 2 * self.n_bins + 1
+        self.cells = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+        
+        magnitudes = np.exp((np.arange(1, self.n_bins + 1) + self.offset) * self.log_gamma)
+        representatives = 2 * magnitudes / (1 + np.exp(self.log_gamma))
+        self.values = np.concatenate([-representatives[::-1], [0.0], representatives])
+    
+    def keys(self, block: np.ndarray) -> np.ndarray:
+        magnitude = np.abs(block)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            bins = np.ceil(np.log(np.maximum(magnitude, self.min_value)) / self.log_gamma) - self.offset
+        bins = np.where(magnitude < self.min_value, 0, np.clip(np.nan_to_num(bins), 1, self.n_bins))
+        return (np.sign(block) * bins).astype(np.int64) + self.n_bins
+    
+    def grow(self, n_groups: int) -> None:
+        self.n_groups = max(self.n_groups, n_groups)
+    
+    def add(self, block: np.ndarray, codes: np.ndarray) -> None:
+        valid = ~np.isnan(block) & (codes >= 0)[:, None]
+        cells = (codes[:, None] * self.n_cols + np.arange(self.n_cols)) * self.n_keys + self.keys(np.nan_to_num(block))
+        new_cells, new_counts = np.unique(cells[valid].astype(np.int64), return_counts=True)
+        
+        positions = np.searchsorted(self.cells, new_cells)
+        found = positions < len(self.cells)
+        found[found] = self.cells[positions[found]] == new_cells[found]
+        np.add.at(self.counts, positions[found], new_counts[found])
+        self.cells = np.insert(self.cells, positions[~found], new_cells[~found])
+        self.counts = np.insert(self.counts, positions[~found], new_counts[~found])
+    
+    def median(self) -> np.ndarray:
+        medians = np.full((self.n_groups, self.n_cols), np.nan)
+        if not len(self.cells):
+            return medians
+        
+        cell, key = np.divmod(self.cells, self.n_keys)
+        starts = np.flatnonzero(np.r_[True, cell[1:] != cell[:-1]])
+        ends = np.r_[starts[1:], len(cell)]
+        cumulative = np.cumsum(self.counts)
+        before = cumulative[starts] - self.counts[starts]
+        total = cumulative[ends - 1] - before
+        
+        lower = key[np.searchsorted(cumulative, before + (total - 1) // 2, side='right')]
+        upper = key[np.searchsorted(cumulative, before + total // 2, side='right')]
+        medians.flat[cell[starts]] = (self.values[lower] + self.values[upper]) / 2
+        return medians
+
+class StreamingAggregator:
+    def __init__(self, stat_cols: List[str], group_col: str = "Team", relative_accuracy: float = 0.01,
+                 block_rows: int = 16384):
+        self.stat_cols = stat_cols
+        self.group_col = group_col
+        self.block_rows = block_rows
+        self.labels = {}
+        self.moments = {None: empty_moments(1, len(stat_cols)), group_col: empty_moments(0, len(stat_cols))}
+        self.sketches = {None: QuantileSketch(1, len(stat_cols), relative_accuracy),
+                         group_col: QuantileSketch(0, len(stat_cols), relative_accuracy)}
+    
+    def group_codes(self, chunk: pd.DataFrame) -> np.ndarray:
+        for label in chunk[self.group_col].dropna().unique():
+            self.labels.setdefault(label, len(self.labels))
+        
+        n_groups = len(self.labels)
+        moments = self.moments[self.group_col]
+        if len(moments['count']) < n_groups:
+            grown = empty_moments(n_groups - len(moments['count']), len(self.stat_cols))
+            self.moments[self.group_col] = {key: np.vstack([moments[key], grown[key]]) for key in moments}
+            self.sketches[self.group_col].grow(n_groups)
+        
+        return chunk[self.group_col].map(self.labels).fillna(-1).to_numpy(dtype=np.intp)
+    
+    def add(self, chunk: pd.DataFrame) -> None:
+        values = np.ascontiguousarray(chunk[self.stat_cols].to_numpy(dtype=float))
+        groupings = {None: (np.zeros(len(chunk), dtype=np.intp), 1),
+                     self.group_col: (self.group_codes(chunk), len(self.labels))}
+        
+        for start in range(0, len(values), self.block_rows):
+            block = values[start:start + self.block_rows]
+            for key, (codes, n_groups) in groupings.items():
+                block_codes = codes[start:start + self.block_rows]
+                self.moments[key] = merge_moments(self.moments[key], block_moments(block, block_codes, n_groups))
+                self.sketches[key].add(block, block_codes)
+    
+    def statistics(self, key: Optional[str]) -> Dict[str, np.ndarray]:
+        stats = dict(self.moments[key])
+        stats['median'] = self.sketches[key].median()
+        if key is None:
+            stats['labels'] = np.array(['All'])
+            return stats
+        
+        labels = np.array(list(self.labels), dtype=str)
+        order = np.argsort(labels, kind='stable')
+        stats = {name: array[order] for name, array in stats.items()}
+        stats['labels'] = labels[order]
+        return stats
+
+def compute_aggregates(df: pd.DataFrame, stat_cols: List[str], group_col: str = None) -> pd.DataFrame:
+    stats = grouped_statistics(df, stat_cols, [group_col] if group_col else [])
+    agg_df = statistics_frame(stats[group_col], stat_cols)
+    if group_col:
+        agg_df.index.name = group_col
     return agg_df
 
-def generate_analysis_report(input_file: str, output_file: str) -> None:
+def team_moments_state(stats: Dict[str, np.ndarray], stat_cols: List[str]) -> Dict[str, np.ndarray]:
+    return {
+        'teams': stats['labels'],
+        'columns': np.array(stat_cols),
+        'count': stats['count'],
+        'mean': np.where(stats['count'] > 0, stats['mean'], np.nan),
+        'm2': stats['m2']
+    }
+
+def team_values_state(df: pd.DataFrame, stat_cols: List[str], group_col: str = "Team") -> Dict[str, np.ndarray]:
+    return {
+        'values': df[stat_cols].to_numpy(dtype=float),
+        'value_teams': df[group_col].fillna('').to_numpy(dtype=str)
+    }
+
+def compute_team_moments(df: pd.DataFrame, stat_cols: List[str], group_col: str = "Team") -> Dict[str, np.ndarray]:
+    state = team_moments_state(grouped_statistics(df, stat_cols, [group_col])[group_col], stat_cols)
+    state.update(team_values_state(df, stat_cols, group_col))
+    return state
+
+def merge_team_moments(state: Dict[str, np.ndarray], changed: Dict[str, np.ndarray],
+                       changed_teams: List[str]) -> Dict[str, np.ndarray]:
+    keep = ~np.isin(state['teams'], changed_teams)
+    merged = {key: np.concatenate([state[key][keep], changed[key]])
+              for key in ('teams', 'count', 'mean', 'm2')}
+    keep_rows = ~np.isin(state['value_teams'], changed_teams)
+    merged.update({key: np.concatenate([state[key][keep_rows], changed[key]])
+                   for key in ('values', 'value_teams')})
+    merged['columns'] = state['columns']
+    return merged
+
+def load_team_rows(input_file: str, teams: List[str], chunk_rows: int = 50000) -> pd.DataFrame:
+    chunks = [preprocess_chunk(chunk[chunk['Team'].isin(teams)].copy())
+              for chunk in iter_results(input_file, chunk_rows=chunk_rows)]
+    return pd.concat(chunks, ignore_index=True)
+
+def global_row_from_moments(stat_cols: List[str], state: Dict[str, np.ndarray]) -> pd.DataFrame:
+    count, mean, m2 = state['count'], np.nan_to_num(state['mean']), np.nan_to_num(state['m2'])
+    n = count.sum(axis=0)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        total_mean = (count * mean).sum(axis=0) / n
+        total_m2 = (m2 + count * (mean - total_mean) ** 2).sum(axis=0)
+        std = np.where(n > 1, np.sqrt(total_m2 / (n - 1)), np.nan)
+    
+    medians = column_medians(state['values'])
+    values = {}
+    for i, col in enumerate(stat_cols):
+        values[f"Mean of {col}"] = total_mean[i] if n[i] else np.nan
+        values[f"Median of {col}"] = medians[i]
+        values[f"Std of {col}"] = std[i]
+    
+    return pd.DataFrame(values, index=['All'])
+
+def save_moments(state: Dict[str, np.ndarray], state_file: str, snapshot: Optional[str]) -> None:
+    with open(state_file, 'wb') as f:
+        np.savez(f, snapshot=np.array(snapshot or ''), **state)
+
+def load_moments(state_file: str) -> Dict[str, np.ndarray]:
+    with np.load(state_file) as data:
+        return {key: data[key] for key in data.files}
+
+def grouping_output_file(output_file: str, group_col: str) -> str:
+    root, ext = os.path.splitext(output_file)
+    return f"{root}_by_{group_col.lower()}{ext}"
+
+def generate_analysis_report(input_file: str, output_file: str, state_file: Optional[str] = None,
+                             extra_groups: Tuple[str, ...] = ()) -> None:
     data = load_and_preprocess_data(input_file)
     cols = get_column_categories(data)
     stat_cols = cols['statistical']
     
-    num_cols = [col for col in stat_cols if col != 'Age']
-    data[num_cols] = data[num_cols].apply(pd.to_numeric, errors='coerce')
-    
-    global_stats = compute_aggregates(data, stat_cols)
-    team_stats = compute_aggregates(data, stat_cols, group_col="Team")
+    stats = grouped_statistics(data, stat_cols, ["Team", *extra_groups])
+    global_stats = statistics_frame(stats[None], stat_cols)
+    team_stats = statistics_frame(stats["Team"], stat_cols)
     
     final_report = pd.concat([global_stats, team_stats])
     final_report.index.name = 'Team'
     
     final_report.to_csv(output_file)
+    if state_file:
+        state = team_moments_state(stats["Team"], stat_cols)
+        state.update(team_values_state(data, stat_cols))
+        save_moments(state, state_file, current_snapshot())
     print(f"Analysis report saved to {output_file}")
+    
+    for group_col in extra_groups:
+        group_report = pd.concat([global_stats, statistics_frame(stats[group_col], stat_cols)])
+        group_report.index.name = group_col
+        group_report.to_csv(grouping_output_file(output_file, group_col))
+        print(f"Analysis by {group_col} saved to {grouping_output_file(output_file, group_col)}")
+
+def update_analysis_report(input_file: str, delta_file: str, output_file: str, state_file: str) -> None:
+    changed_teams = sorted(load_results(delta_file, columns=['Team'])['Team'].dropna().unique())
+    changed_data = load_team_rows(input_file, changed_teams)
+    stat_cols = get_column_categories(changed_data)['statistical']
+    state = load_moments(state_file)
+    
+    if list(state['columns']) != stat_cols or 'values' not in state:
+        print("Statistic columns or saved state changed, recomputing the full report")
+        return generate_analysis_report(input_file, output_file, state_file)
+    
+    state = merge_team_moments(state, compute_team_moments(changed_data, stat_cols), changed_teams)
+    
+    previous = pd.read_csv(output_file, index_col='Team')
+    team_stats = pd.concat([
+        previous.drop(index=['All'] + changed_teams, errors='ignore'),
+        compute_aggregates(changed_data, stat_cols, group_col="Team")
+    ]).sort_index()
+    
+    final_report = pd.concat([global_row_from_moments(stat_cols, state), team_stats])
+    final_report.index.name = 'Team'
+    
+    final_report.to_csv(output_file)
+    save_moments(state, state_file, current_snapshot())
+    print(f"Analysis report updated for {len(changed_teams)} changed teams and saved to {output_file}")
+
+def stream_analysis_report(input_file: str, output_file: str, chunk_rows: int = 50000,
+                           relative_accuracy: float = 0.01) -> None:
+    aggregator = None
+    rows = 0
+    for chunk in iter_results(input_file, chunk_rows=chunk_rows):
+        chunk = preprocess_chunk(chunk)
+        if aggregator is None:
+            aggregator = StreamingAggregator(get_column_categories(chunk)['statistical'],
+                                             relative_accuracy=relative_accuracy)
+        aggregator.add(chunk)
+        rows += len(chunk)
+    
+    if aggregator is None:
+        print(f"No player rows found in {input_file}")
+        return
+    
+    final_report = pd.concat([statistics_frame(aggregator.statistics(key), aggregator.stat_cols)
+                              for key in (None, aggregator.group_col)])
+    final_report.index.name = 'Team'
+    
+    final_report.to_csv(output_file)
+    print(f"Analysis report over {rows} rows streamed in chunks of {chunk_rows} saved to {output_file} "
+          f"(medians within {relative_accuracy:.0%})")
+
+def run_analysis(input_file: str, output_file: str = "results2.csv", state_file: str = "results2_state.npz",
+                 extra_groups: Tuple[str, ...] = ()) -> None:
+    if not extra_groups and os.path.exists(output_file) and os.path.exists(state_file):
+        snapshot = str(load_moments(state_file)['snapshot'])
+        if snapshot and snapshot == current_snapshot():
+            print(f"{output_file} is up to date")
+            return
+        if delta_file := applicable_delta(snapshot):
+            return update_analysis_report(input_file, delta_file, output_file, state_file)
+    
+    generate_analysis_report(input_file, output_file, state_file, extra_groups)
 
 if __name__ == "__main__":
-    generate_analysis_report("results.csv", "results2.csv")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Mean, median and std of every statistic, overall and per team")
+    parser.add_argument('--group-by', nargs='+', choices=['Position', 'Nation'], default=[],
+                        help="also aggregate by these columns, in the same pass over the data")
+    parser.add_argument('--stream', action='store_true',
+                        help="read the dataset in chunks with approximate medians; memory grows with the "
+                             "value bins occupied per team and statistic rather than with rows")
+    parser.add_argument('--chunk-rows', type=int, default=50000, help="rows per chunk in --stream mode")
+    parser.add_argument('--median-accuracy', type=float, default=0.01,
+                        help="relative accuracy of the streamed medians")
+    args = parser.parse_args()
+    
+    if args.stream and args.group_by:
+        parser.error("--group-by is not supported with --stream")
+    
+    if args.stream:
+        stream_analysis_report(default_results_path(), "results2.csv", args.chunk_rows, args.median_accuracy)
+    else:
+        run_analysis(default_results_path(), extra_groups=tuple(args.group_by))
\ No newline at end of file
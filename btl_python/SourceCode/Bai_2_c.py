@@ -1,50 +1,123 @@
-import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
+import argparse
+import hashlib
+import json
 import os
-
-df = pd.read_csv("results.csv")
+from concurrent.futures import ProcessPoolExecutor
+from data_loader import default_results_path
+from histogram_cache import cached_histograms, HISTOGRAM_CACHE
 
 selected_stats = ['performance_goals', 'performance_assists', 'creation_sca', 'defense_tackles', 'defense_interceptions', 'miscellaneous_performance_recoveries']
 
 output_dir = "team_histograms"
-os.makedirs(output_dir, exist_ok=True)
+manifest_name = "histograms_manifest.json"
+chart_version = 1
+
+def histogram_jobs(histograms):
+    stats = [str(stat) for stat in histograms['stats']]
+    jobs = [{
+        'filename': "all_players_hist.png",
+        'titles': [f"All Players - {stat}" for stat in stats],
+        'stats': stats,
+        'suptitle': None,
+        'ylabel': "Number of Players",
+        'color': 'cornflowerblue',
+        'edges': histograms['all_edges'],
+        'counts': histograms['all_counts']
+    }]
+
+    for i, team in enumerate(str(team) for team in histograms['teams']):
+        safe_name = team.replace(" ", "_").replace("/", "_")
+        jobs.append({
+            'filename': f"{safe_name}_hist.png",
+            'titles': [f"{team} - {stat}" for stat in stats],
+            'stats': stats,
+            'suptitle': f"{team} - Player Stat Distribution",
+            'ylabel': "Players",
+            'color': 'salmon',
+            'edges': histograms['team_edges'][i],
+            'counts': histograms['team_counts'][i]
+        })
+    return jobs
+
+def job_signature(job):
+    digest = hashlib.sha1()
+    digest.update(json.dumps([chart_version, job['titles'], job['stats'], job['suptitle'],
+                              job['ylabel'], job['color']]).encode('utf-8'))
+    digest.update(np.ascontiguousarray(job['edges']).tobytes())
+    digest.update(np.ascontiguousarray(job['counts']).tobytes())
+    return digest.hexdigest()
 
-def plot_all_players_hist(df):
+def render_histogram_figure(job, directory=output_dir, show=False):
     fig, axes = plt.subplots(2, 3, figsize=(15, 10))
     axes = axes.flatten()
-    
-    for i, stat in enumerate(selected_stats):
-        axes[i].hist(df[stat], bins=20, color='cornflowerblue', edgecolor='black')
-        axes[i].set_title(f"All Players - {stat}")
+
+    for i, stat in enumerate(job['stats']):
+        edges, counts = job['edges'][i], job['counts'][i]
+        axes[i].hist(edges[:-1], bins=edges, weights=counts, color=job['color'], edgecolor='black')
+        axes[i].set_title(job['titles'][i])
         axes[i].set_xlabel(stat)
-        axes[i].set_ylabel("Number of Players")
-    
+        axes[i].set_ylabel(job['ylabel'])
+
     plt.tight_layout()
-    plt.savefig(f"{output_dir}/all_players_hist.png")
-    plt.show()
-    plt.close()
-
-plot_all_players_hist(df)
-
-def plot_each_team_hist(df):
-    teams = df['Team'].unique()
-    
-    for team in teams:
-        team_df = df[df['Team'] == team]
-        fig, axes = plt.subplots(2, 3, figsize=(15, 10))
-        axes = axes.flatten()
-
-        for i, stat in enumerate(selected_stats):
-            axes[i].hist(team_df[stat], bins=10, color='salmon', edgecolor='black')
-            axes[i].set_title(f"{team} - {stat}")
-            axes[i].set_xlabel(stat)
-            axes[i].set_ylabel("Players")
-
-        plt.tight_layout()
-        plt.suptitle(f"{team} - Player Stat Distribution", fontsize=16, y=1.02)
-        safe_name = team.replace(" ", "_").replace("/", "_")
-        plt.savefig(f"{output_dir}/{safe_name}_hist.png")
+    if job['suptitle']:
+        plt.suptitle(job['suptitle'], fontsize=16, y=1.02)
+    fig.savefig(os.path.join(directory, job['filename']))
+    if show:
         plt.show()
-        plt.close()
+    plt.close(fig)
+    return job['filename']
+
+def use_agg_backend():
+    plt.switch_backend('Agg')
+
+def load_manifest(directory=output_dir):
+    try:
+        with open(os.path.join(directory, manifest_name), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest, directory=output_dir):
+    with open(os.path.join(directory, manifest_name), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+def render_histograms(jobs, directory=output_dir, workers=None, force=False, show=False):
+    os.makedirs(directory, exist_ok=True)
+    manifest = load_manifest(directory)
+    signatures = {job['filename']: job_signature(job) for job in jobs}
+    pending = [job for job in jobs
+               if force or show or manifest.get(job['filename']) != signatures[job['filename']]
+               or not os.path.exists(os.path.join(directory, job['filename']))]
+
+    if show:
+        for job in pending:
+            render_histogram_figure(job, directory, show=True)
+    elif pending:
+        with ProcessPoolExecutor(max_workers=workers, initializer=use_agg_backend) as executor:
+            for filename in executor.map(render_histogram_figure, pending, [directory] * len(pending)):
+                manifest[filename] = signatures[filename]
+
+    if show:
+        manifest.update({job['filename']: signatures[job['filename']] for job in pending})
+    save_manifest(manifest, directory)
+    print(f"Rendered {len(pending)} of {len(jobs)} histogram figures into {directory} "
+          f"({len(jobs) - len(pending)} unchanged)")
+
+def run_histograms(input_file, cache_path=HISTOGRAM_CACHE, workers=None, force=False, show=False):
+    if not show:
+        use_agg_backend()
+
+    histograms = cached_histograms(input_file, selected_stats, cache_path)
+    render_histograms(histogram_jobs(histograms), workers=workers, force=force, show=show)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Histograms of selected statistics for all players and each team")
+    parser.add_argument('--workers', type=int, default=None, help="rendering processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="re-render figures whose data is unchanged")
+    parser.add_argument('--show', action='store_true', help="display each figure interactively, rendering serially")
+    parser.add_argument('--cache', default=HISTOGRAM_CACHE, help="bin edges and counts cache file")
+    args = parser.parse_args()
 
-plot_each_team_hist(df)
+    run_histograms(default_results_path(), args.cache, args.workers, args.force, args.show)
@@ -1,84 +1,208 @@
 import pandas as pd
+import numpy as np
 from termcolor import colored
 import matplotlib.pyplot as plt
+import argparse
+import hashlib
+import json
+import os
 
-def analyze_premier_league_stats(data_path):
+weights = {
+    'Goals': 1.2,
+    'Possession': 0.8,
+    'Shots': 1.0,
+    'Pass Accuracy': 0.9,
+    'Tackles': 0.7
+}
+
+weight_aliases = {
+    'Goals': 'performance_goals',
+    'Possession': 'possession_touches_total',
+    'Shots': 'shooting_sot_per90',
+    'Pass Accuracy': 'passing_total_completion_pct',
+    'Tackles': 'defense_tackles'
+}
+
+lower_is_better = [
+    'performance_yellow_cards', 'performance_red_cards', 'goalkeeping_ga90', 'defense_challenges_lost',
+    'possession_take_ons_tackled_pct', 'possession_carries_miscontrols', 'possession_carries_dispossessed',
+    'miscellaneous_performance_fouls', 'miscellaneous_performance_offsides', 'miscellaneous_aerials_lost'
+]
+
+normalization_modes = ['raw', 'zscore', 'minmax', 'percentile']
+scaling_cache = 'team_scaling.npz'
+scaling_version = 2
+
+def resolve_weights(profile, attributes):
+    index = {attribute: i for i, attribute in enumerate(attributes)}
+    vector = np.ones(len(attributes))
+    for key, weight in profile.items():
+        attribute = key.replace('Mean of ', '')
+        attribute = attribute if attribute in index else weight_aliases.get(key)
+        if attribute not in index:
+            raise ValueError(f"Weight '{key}' does not match any 'Mean of' column")
+        vector[index[attribute]] = weight
+    return vector
+
+def weight_matrix(profiles, attributes):
+    return np.vstack([resolve_weights(profile, attributes) for profile in profiles.values()])
+
+def team_metrics(df):
+    teams = df[df['Team'] != 'All'].reset_index(drop=True).copy()
+    mean_columns = [col for col in teams.columns if col.startswith('Mean of')]
+    attributes = [col.replace('Mean of ', '') for col in mean_columns]
+    values = teams[mean_columns].to_numpy(dtype=float)
+    return teams, mean_columns, attributes, values
+
+def metric_directions(attributes):
+    return np.where(np.isin(attributes, lower_is_better), -1.0, 1.0)
+
+def normalize_metrics(values, directions, mode):
+    if mode == 'raw':
+        return values
+    oriented = values * directions
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if mode == 'zscore':
+            scaled = (oriented - np.nanmean(oriented, axis=0)) / np.nanstd(oriented, axis=0)
+        elif mode == 'minmax':
+            low, high = np.nanmin(oriented, axis=0), np.nanmax(oriented, axis=0)
+            scaled = (oriented - low) / (high - low)
+        else:
+            scaled = pd.DataFrame(oriented).rank(pct=True).to_numpy()
+    constant = np.nanmax(oriented, axis=0) == np.nanmin(oriented, axis=0)
+    scaled = np.where(constant, 0.0, scaled)
+    return np.where(np.isnan(scaled), np.nanmean(scaled, axis=0), scaled)
+
+def scaling_key(teams, attributes, values):
+    digest = hashlib.sha1(repr((scaling_version, list(teams), list(attributes), lower_is_better)).encode('utf-8'))
+    digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()
+
+def cached_scaling(teams, attributes, values, cache_path=scaling_cache):
+    key = scaling_key(teams, attributes, values)
+    try:
+        with np.load(cache_path) as data:
+            if str(data['key']) == key:
+                return {mode: data[mode] for mode in normalization_modes}
+    except (OSError, ValueError, KeyError):
+        pass
+
+    directions = metric_directions(attributes)
+    scaled = {mode: normalize_metrics(values, directions, mode) for mode in normalization_modes}
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, key=np.array(key), **scaled)
+    os.replace(tmp_path, cache_path)
+    return scaled
+
+def metric_leaders(values, directions):
+    oriented = values * directions
+    leaders = np.where(np.isnan(oriented), -np.inf, oriented).argmax(axis=0)
+    return leaders, values[leaders, np.arange(values.shape[1])]
+
+def leader_stars(zscores, leaders):
+    return np.clip(np.round(zscores[leaders, np.arange(zscores.shape[1])]), 1, 5).astype(int)
+
+def score_teams(values, weight_rows):
+    return np.nan_to_num(values) @ weight_rows.T
+
+def score_profiles(df, profiles, mode='raw', scaled=None):
+    teams, _, attributes, values = team_metrics(df)
+    if scaled is None:
+        scaled = normalize_metrics(values, metric_directions(attributes), mode)
+    scores = score_teams(scaled, weight_matrix(profiles, attributes))
+    return pd.DataFrame(scores, columns=list(profiles), index=teams['Team'])
+
+def load_profiles(path):
+    if path is None:
+        return {'default': weights}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def analyze_premier_league_stats(data_path, profiles=None, mode='raw'):
     try:
         df = pd.read_csv(data_path)
     except FileNotFoundError:
         print(colored("Lỗi: Không tìm thấy file dữ liệu. Vui lòng kiểm tra đường dẫn.", 'red'))
         return
-    
+
+    profiles = profiles or {'default': weights}
+    teams, mean_columns, attributes, values = team_metrics(df)
+    directions = metric_directions(attributes)
+    scaled = cached_scaling(teams['Team'], attributes, values)
+
     print(colored("\nPHÂN TÍCH HIỆU SUẤT PREMIER LEAGUE 2024-2025", 'cyan', attrs=['bold']))
     print(colored("="*60, 'cyan'))
-    
-    performance_analysis = []
-    mean_columns = [col for col in df.columns if col.startswith('Mean of')]
-    
-    weights = {
-        'Goals': 1.2,
-        'Possession': 0.8,
-        'Shots': 1.0,
-        'Pass Accuracy': 0.9,
-        'Tackles': 0.7
-    }
-    
-    df['Weighted Total Score'] = 0
-    
-    for col in mean_columns:
-        attribute = col.replace('Mean of ', '')
-        best_team = df.loc[df[col].idxmax(), 'Team']
-        best_value = df[col].max()
-        
-        performance_analysis.append({
-            'Chỉ số': attribute,
-            'Đội xuất sắc nhất': best_team,
-            'Giá trị trung bình': round(best_value, 2),
-            'Đánh giá': '⭐' * int(best_value/20) 
-        })
-        
-        weight = weights.get(attribute, 1.0)
-        df['Weighted Total Score'] += df[col] * weight
-        
-        print(colored(f"🏅 {attribute.upper():<15}", 'yellow') + 
+
+    leaders, best_values = metric_leaders(values, directions)
+    best_teams = teams['Team'].to_numpy()[leaders]
+    performance_analysis = pd.DataFrame({
+        'Chỉ số': attributes,
+        'Đội xuất sắc nhất': best_teams,
+        'Giá trị trung bình': np.round(best_values, 2),
+        'Đánh giá': ['⭐' * stars for stars in leader_stars(scaled['zscore'], leaders)]
+    })
+
+    for attribute, best_team, best_value in zip(attributes, best_teams, best_values):
+        print(colored(f"🏅 {attribute.upper():<15}", 'yellow') +
               f": {best_team:<20} ({best_value:.2f})")
-    
-    best_overall = df.loc[df['Weighted Total Score'].idxmax()]
+
+    scores = score_profiles(df, profiles, mode, scaled[mode])
+    teams['Weighted Total Score'] = scores.iloc[:, 0].to_numpy()
+    best_overall = teams.loc[teams['Weighted Total Score'].idxmax()]
     print(colored("\n🔥 KẾT QUẢ TỔNG HỢP 🔥", 'magenta', attrs=['bold']))
     print(colored(f"Đội bóng xuất sắc nhất: {best_overall['Team']}", 'green', attrs=['bold']))
-    print(colored(f"Điểm tổng hợp có trọng số: {best_overall['Weighted Total Score']:.2f}", 'green'))
-    
-    report_df = pd.DataFrame(performance_analysis)
-    detailed_report = pd.merge(report_df, df, left_on='Đội xuất sắc nhất', right_on='Team')
-    
+    print(colored(f"Điểm tổng hợp có trọng số ({mode}): {best_overall['Weighted Total Score']:.2f}", 'green'))
+
+    if len(profiles) > 1:
+        for name, team, score in zip(profiles, scores.idxmax(), scores.max()):
+            print(f"   {name:<20}: {team:<20} ({score:.2f})")
+        profile_path = 'Profile_Scores.csv'
+        scores.to_csv(profile_path, encoding='utf-8-sig')
+        print(colored(f"📊 Điểm theo {len(profiles)} bộ trọng số đã được lưu tại: {profile_path}", 'blue'))
+
+    detailed_report = pd.merge(performance_analysis, teams, left_on='Đội xuất sắc nhất', right_on='Team')
+
     output_path = 'Detailed_Premier_League_Analysis.csv'
     detailed_report.to_csv(output_path, index=False, encoding='utf-8-sig')
     print(colored(f"\n📊 Báo cáo chi tiết đã được lưu tại: {output_path}", 'blue'))
-    
-    plot_top_teams(df, mean_columns)
-    
+
+    plot_top_teams(teams, mean_columns)
+
     return detailed_report
 
 def plot_top_teams(df, metrics):
     plt.figure(figsize=(12, 8))
-    
+
     top_teams = df.nlargest(5, 'Weighted Total Score')
-    
-    for metric in metrics[:3]: 
+
+    for metric in metrics[:3]:
         metric_name = metric.replace('Mean of ', '')
         plt.barh(
             top_teams['Team'] + ' - ' + metric_name,
             top_teams[metric],
             label=metric_name
         )
-    
+
     plt.title('Top 5 Teams Performance Analysis')
     plt.xlabel('Score')
     plt.ylabel('Team and Metric')
     plt.legend()
     plt.tight_layout()
     plt.savefig('top_teams_visualization.png')
+    plt.close()
     print(colored("🖼️ Biểu đồ so sánh đã được lưu thành hình ảnh.", 'blue'))
 
 if __name__ == "__main__":
-    analyze_premier_league_stats('results2.csv')
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Rank teams by a weighted score of their mean statistics")
+    parser.add_argument('--input', default='results2.csv')
+    parser.add_argument('--profiles', help="JSON file mapping profile names to {metric: weight}")
+    parser.add_argument('--normalize', choices=normalization_modes, default='raw',
+                        help="scale each metric across teams before weighting (raw = original units; "
+                             "the other modes flip lower-is-better metrics)")
+    args = parser.parse_args()
+
+    try:
+        analyze_premier_league_stats(args.input, load_profiles(args.profiles), args.normalize)
+    except ValueError as e:
+        parser.error(str(e))
@@ -1,66 +1,160 @@
-import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler
-from sklearn.impute import SimpleImputer
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
 from sklearn.metrics import silhouette_score
 import matplotlib.pyplot as plt
 import seaborn as sns
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from threadpoolctl import threadpool_limits
+from data_loader import load_results
+from cluster_model import ClusteringPipeline, make_kmeans, CLUSTER_MODEL
 
-df = pd.read_csv('results.csv')
-
-df_numeric = df.select_dtypes(include=[np.number])
-imputer = SimpleImputer(strategy='mean')
-df_imputed = pd.DataFrame(imputer.fit_transform(df_numeric), columns=df_numeric.columns)
-
-scaler = StandardScaler()
-df_scaled = scaler.fit_transform(df_imputed)
-
-inertias = []
-silhouette_scores = []
-K = range(2, 11)
-
-for k in K:
-    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-    labels = kmeans.fit_predict(df_scaled)
-    inertias.append(kmeans.inertia_)
-    silhouette_scores.append(silhouette_score(df_scaled, labels))
-
-fig, ax = plt.subplots(1, 2, figsize=(14, 5))
-
-ax[0].plot(K, inertias, marker='o')
-ax[0].set_title('Elbow Method')
-ax[0].set_xlabel('Số cụm (k)')
-ax[0].set_ylabel('Inertia')
-ax[0].grid(True)
-
-ax[1].plot(K, silhouette_scores, marker='o', color='green')
-ax[1].set_title('Silhouette Score')
-ax[1].set_xlabel('Số cụm (k)')
-ax[1].set_ylabel('Silhouette Score')
-ax[1].grid(True)
-
-plt.tight_layout()
-plt.savefig("elbow_silhouette.png")  
-plt.show()
-
-best_k = 3
-kmeans = KMeans(n_clusters=best_k, random_state=42, n_init=10)
-clusters = kmeans.fit_predict(df_scaled)
-
-pca = PCA(n_components=2)
-df_pca = pca.fit_transform(df_scaled)
-
-df_plot = pd.DataFrame(df_pca, columns=["PC1", "PC2"])
-df_plot["Cluster"] = clusters
-
-plt.figure(figsize=(8, 6))
-sns.scatterplot(data=df_plot, x="PC1", y="PC2", hue="Cluster", palette="Set2", s=60)
-plt.title(f"Phân cụm cầu thủ với KMeans (k={best_k}) sau PCA")
-plt.xlabel("Thành phần chính 1")
-plt.ylabel("Thành phần chính 2")
-plt.grid(True)
-plt.tight_layout()
-plt.savefig("player_clusters_pca.png") 
-plt.show()
+MINIBATCH_ROWS = 10000
+
+def stratified_sample(labels, sample_size, random_state=42):
+    if sample_size is None or sample_size >= len(labels):
+        return np.arange(len(labels))
+
+    rng = np.random.default_rng(random_state)
+    clusters, counts = np.unique(labels, return_counts=True)
+    quotas = np.maximum(np.round(counts * sample_size / len(labels)).astype(int), np.minimum(counts, 2))
+
+    picked = [rng.choice(np.flatnonzero(labels == cluster), quota, replace=False)
+              for cluster, quota in zip(clusters, quotas)]
+    return np.sort(np.concatenate(picked))
+
+def limit_worker_threads():
+    threadpool_limits(1)
+
+def evaluate_k(X, k, minibatch=False, sample_size=2000, random_state=42):
+    kmeans = make_kmeans(k, minibatch, random_state)
+    labels = kmeans.fit_predict(X)
+    sample = stratified_sample(labels, sample_size, random_state)
+    return k, kmeans.inertia_, silhouette_score(X[sample], labels[sample])
+
+def sweep_k(X, k_values, minibatch=False, sample_size=2000, workers=None, random_state=42):
+    k_values = list(k_values)
+    if workers == 1:
+        results = [evaluate_k(X, k, minibatch, sample_size, random_state) for k in k_values]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=limit_worker_threads) as executor:
+            results = list(executor.map(evaluate_k, [X] * len(k_values), k_values, [minibatch] * len(k_values),
+                                        [sample_size] * len(k_values), [random_state] * len(k_values)))
+
+    _, inertias, silhouette_scores = map(list, zip(*results))
+    return inertias, silhouette_scores
+
+def elbow_k(k_values, inertias):
+    k_values = np.asarray(k_values, dtype=float)
+    inertias = np.asarray(inertias, dtype=float)
+    if len(k_values) < 3:
+        return int(k_values[0])
+
+    x = (k_values - k_values[0]) / (k_values[-1] - k_values[0])
+    span = inertias[0] - inertias[-1]
+    y = (inertias[0] - inertias) / span if span else np.zeros_like(inertias)
+    return int(k_values[np.argmax(y - x)])
+
+def choose_k(k_values, inertias, silhouette_scores, tolerance=0.05):
+    k_values = list(k_values)
+    elbow = elbow_k(k_values, inertias)
+    best = max(silhouette_scores)
+
+    candidates = [k for k, score in zip(k_values, silhouette_scores) if score >= best - tolerance * abs(best)]
+    return min(candidates, key=lambda k: (abs(k - elbow), k)), elbow
+
+def plot_k_selection(K, inertias, silhouette_scores, best_k, show=False):
+    fig, ax = plt.subplots(1, 2, figsize=(14, 5))
+
+    ax[0].plot(K, inertias, marker='o')
+    ax[0].axvline(best_k, color='gray', linestyle='--')
+    ax[0].set_title('Elbow Method')
+    ax[0].set_xlabel('Số cụm (k)')
+    ax[0].set_ylabel('Inertia')
+    ax[0].grid(True)
+
+    ax[1].plot(K, silhouette_scores, marker='o', color='green')
+    ax[1].axvline(best_k, color='gray', linestyle='--')
+    ax[1].set_title('Silhouette Score')
+    ax[1].set_xlabel('Số cụm (k)')
+    ax[1].set_ylabel('Silhouette Score')
+    ax[1].grid(True)
+
+    plt.tight_layout()
+    plt.savefig("elbow_silhouette.png")
+    if show:
+        plt.show()
+    plt.close(fig)
+
+def plot_clusters(assignments, best_k, show=False):
+    df_plot = assignments[["PC1", "PC2", "Cluster"]]
+
+    plt.figure(figsize=(8, 6))
+    sns.scatterplot(data=df_plot, x="PC1", y="PC2", hue="Cluster", palette="Set2", s=60)
+    plt.title(f"Phân cụm cầu thủ với KMeans (k={best_k}) sau PCA")
+    plt.xlabel("Thành phần chính 1")
+    plt.ylabel("Thành phần chính 2")
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig("player_clusters_pca.png")
+    if show:
+        plt.show()
+    plt.close()
+
+def fit_pipeline(df, args):
+    model = ClusteringPipeline()
+    df_scaled = model.fit_preprocessing(df)
+    minibatch = args.minibatch == 'on' or (args.minibatch == 'auto' and len(df_scaled) > MINIBATCH_ROWS)
+
+    if args.k:
+        best_k = args.k
+    else:
+        K = range(args.k_min, args.k_max + 1)
+        inertias, silhouette_scores = sweep_k(df_scaled, K, minibatch, args.sample_size or None, args.workers)
+        best_k, elbow = choose_k(K, inertias, silhouette_scores)
+        print(f"Elbow at k={elbow}, best silhouette {max(silhouette_scores):.3f}; using k={best_k}")
+        plot_k_selection(K, inertias, silhouette_scores, best_k, args.show)
+
+    return model.fit(df, best_k, minibatch, X=df_scaled)
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Cluster players with KMeans and choose k automatically")
+    parser.add_argument('--k-min', type=int, default=2)
+    parser.add_argument('--k-max', type=int, default=10)
+    parser.add_argument('--k', type=int, help="use this k instead of choosing it from the sweep")
+    parser.add_argument('--sample-size', type=int, default=2000,
+                        help="players sampled per cluster-stratified silhouette estimate (0 = all)")
+    parser.add_argument('--minibatch', choices=['auto', 'on', 'off'], default='auto',
+                        help=f"use MiniBatchKMeans (auto: above {MINIBATCH_ROWS} players)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processes fitting candidate k values, one BLAS/OpenMP thread each")
+    parser.add_argument('--model', default=CLUSTER_MODEL, help="saved clustering pipeline")
+    parser.add_argument('--refit', action='store_true', help="refit the pipeline even if a saved one exists")
+    parser.add_argument('--show', action='store_true', help="display the figures interactively")
+    return parser
+
+def run_clustering(args):
+    if not args.show:
+        plt.switch_backend('Agg')
+
+    df = load_results()
+    model = None
+    if not args.refit and os.path.exists(args.model):
+        model = ClusteringPipeline.load(args.model)
+        if not model.matches(df) or (args.k and args.k != model.k):
+            print("Saved clustering pipeline does not match the data or k, refitting")
+            model = None
+
+    if model is None:
+        model = fit_pipeline(df, args)
+        print(f"Fitted clustering pipeline with k={model.k} on {len(df)} players")
+    else:
+        assigned, removed = model.update(df)
+        print(f"Assigned {assigned} new or changed players to the saved k={model.k} clusters, "
+              f"dropped {removed}")
+
+    model.save(args.model)
+    plot_clusters(model.assignments, model.k, args.show)
+
+if __name__ == "__main__":
+    run_clustering(build_arg_parser().parse_args())
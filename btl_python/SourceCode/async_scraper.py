@@ -0,0 +1,156 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import aiohttp
+
+from Bai_1 import FootballDataScraper, parse_team_page, parse_args, scraper_options
+
+class AsyncTokenBucket:
+    def __init__(self, rate, capacity=1):
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class AsyncFootballDataScraper(FootballDataScraper):
+    def __init__(self, max_concurrency=1, requests_per_second=None, backoff_base=2.0,
+                 backoff_cap=60.0, **kwargs):
+        super().__init__(max_concurrency=max_concurrency, requests_per_second=requests_per_second, **kwargs)
+        self.session = None
+        self.rate_limiter = AsyncTokenBucket(self.rate_limiter.rate) if self.rate_limiter else None
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.parse_executor = None
+
+    async def throttle(self):
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
+        else:
+            await asyncio.sleep(random.uniform(*self.request_delay))
+
+    def backoff_delay(self, attempt):
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    async def fetch_page(self, url, max_retries=3):
+        cached = self.cache.lookup(url) if self.cache else None
+        if cached and self.cache.is_fresh(cached):
+            if (body := self.cache.read(url, cached, 'hits')) is not None:
+                return body
+            cached = None
+
+        for attempt in range(max_retries):
+            try:
+                await self.throttle()
+                started = time.perf_counter()
+                self.record_timing('requests', 1)
+                headers = self.cache.conditional_headers(cached) if cached else None
+                try:
+                    async with self.session.get(url, headers=headers) as response:
+                        if response.status == 304 and cached:
+                            if (body := self.cache.read(url, cached, 'revalidated')) is not None:
+                                return body
+                            cached = None
+                            continue
+
+                        response.raise_for_status()
+
+                        if 'text/html' not in response.headers.get('Content-Type', ''):
+                            raise ValueError("Invalid content type")
+
+                        body = await response.text()
+                finally:
+                    self.record_timing('network', time.perf_counter() - started)
+
+                if self.cache:
+                    self.cache.store(url, body, response.headers)
+                return body
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"Attempt {attempt + 1} failed for {url}: {e}")
+                if attempt == max_retries - 1:
+                    return None
+                await asyncio.sleep(self.backoff_delay(attempt))
+
+    async def process_team_data(self, team_name, team_url, semaphore):
+        async with semaphore:
+            print(f"Processing {team_name}...")
+            team_html = await self.fetch_page(team_url)
+
+        if not team_html:
+            print(f"Failed to fetch data for {team_name}")
+            return
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.parse_executor, partial(
+            parse_team_page, self.parser, team_name, team_html, known_hash=self.known_hash(team_name)))
+        self.store_team_result(team_name, result)
+        self.save_checkpoint(team_url)
+        print(f"Completed processing {team_name}")
+
+    async def process_teams(self, team_links):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(
+            *(self.process_team_data(team_name, team_url, semaphore)
+              for team_name, team_url in team_links.items()),
+            return_exceptions=True
+        )
+        for team_name, result in zip(team_links, results):
+            if isinstance(result, Exception):
+                print(f"Error processing {team_name}: {result}")
+
+    def open_session(self):
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=30)
+        return aiohttp.ClientSession(headers=self.headers, connector=connector,
+                                     timeout=aiohttp.ClientTimeout(total=15))
+
+    async def run_async(self):
+        print("Starting async football data scraper...")
+        started = time.perf_counter()
+        self.load_checkpoint()
+        self.load_previous_snapshot()
+
+        if self.pipeline:
+            self.parse_executor = ProcessPoolExecutor(max_workers=self.parse_workers)
+        try:
+            async with self.open_session() as session:
+                self.session = session
+                team_links = self.pending_team_links(await self.fetch_page(self.base_url + "/en/"))
+                if team_links is None:
+                    return
+                await self.process_teams(team_links)
+        finally:
+            self.session = None
+            if self.parse_executor:
+                self.parse_executor.shutdown()
+                self.parse_executor = None
+
+        self.finish_run(team_links, started)
+
+    def run(self):
+        asyncio.run(self.run_async())
+
+if __name__ == "__main__":
+    args = parse_args()
+    scraper = AsyncFootballDataScraper(**scraper_options(args))
+    if args.fresh:
+        scraper.clear_checkpoint()
+    scraper.run()
@@ -0,0 +1,100 @@
+import sys
+import time
+from bs4 import BeautifulSoup
+
+from Bai_1 import (FootballDataScraper, PlayerRecord, STAT_TABLE_FIELDS, stat_table_id, parse_row,
+                   collect_fields, locate_table_fragments, available_parsers)
+
+STANDARD_INFO_STATS = ['nationality', 'position', 'age', 'minutes']
+
+def load_page(html_path):
+    with open(html_path, encoding='utf-8') as f:
+        return f.read()
+
+def collect_rows(html):
+    table_ids = {kind: stat_table_id(kind) for kind in STAT_TABLE_FIELDS}
+    fragments = locate_table_fragments(html, table_ids.values())
+    rows = []
+    for kind, table_id in table_ids.items():
+        if table_id not in fragments:
+            continue
+        table = BeautifulSoup(fragments[table_id], 'html.parser').find('table')
+        if (body := table.find('tbody')):
+            rows.extend((kind, row) for row in body.find_all('tr'))
+    return rows
+
+def legacy_fill(row, kind, record):
+    player_cell = row.find('th', {'data-stat': 'player'})
+    if not player_cell or not player_cell.find('a'):
+        return
+
+    stats = list(STAT_TABLE_FIELDS[kind])
+    if kind == 'standard':
+        stats += STANDARD_INFO_STATS
+
+    for stat in stats:
+        if (cell := row.find('td', {'data-stat': stat})):
+            record[stat] = cell.text.strip()
+
+def single_pass_fill(row, kind, record):
+    if (cells := parse_row(row)):
+        record.update(collect_fields(cells, STAT_TABLE_FIELDS[kind]))
+
+def best_time(func, rows, record, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for kind, row in rows:
+            func(row, kind, record)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def benchmark_row_parsing(html_path, repeat=5):
+    rows = collect_rows(load_page(html_path))
+    if not rows:
+        print(f"No stats tables found in {html_path}")
+        return
+
+    record = PlayerRecord('benchmark')
+    legacy = best_time(legacy_fill, rows, {}, repeat)
+    single_pass = best_time(single_pass_fill, rows, record, repeat)
+
+    print(f"Rows parsed: {len(rows)} (best of {repeat})")
+    print(f"Per-field row.find: {legacy * 1000:.1f} ms")
+    print(f"Single-pass parse_row: {single_pass * 1000:.1f} ms")
+    print(f"Speedup: {legacy / single_pass:.1f}x")
+
+def build_records(parser, html):
+    scraper = FootballDataScraper(parser=parser)
+    started = time.perf_counter()
+    scraper.process_team_html('Benchmark', html)
+    return scraper.to_dataframe(), time.perf_counter() - started
+
+def parser_results(html, repeat=1):
+    results = {}
+    for parser in available_parsers():
+        timings = []
+        for _ in range(repeat):
+            records, elapsed = build_records(parser, html)
+            timings.append(elapsed)
+        results[parser] = (records, min(timings))
+    return results
+
+def compare_parsers(html_path, repeat=3):
+    results = parser_results(load_page(html_path), repeat)
+
+    reference, reference_time = results['html.parser']
+    for parser, (records, elapsed) in results.items():
+        if not records.equals(reference):
+            raise AssertionError(f"{parser} produced different player records than html.parser")
+        print(f"{parser:<12} {elapsed * 1000:8.1f} ms  {reference_time / elapsed:5.1f}x  "
+              f"{len(records)} players")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python benchmark_scraper.py <saved_team_page.html>")
+        sys.exit(1)
+
+    benchmark_row_parsing(sys.argv[1])
+    print()
+    compare_parsers(sys.argv[1])
@@ -0,0 +1,101 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.decomposition import PCA
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler
+
+from data_loader import player_keys
+
+CLUSTER_MODEL = 'cluster_model.joblib'
+
+def make_kmeans(k, minibatch=False, random_state=42):
+    if minibatch:
+        return MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=3, batch_size=4096)
+    return KMeans(n_clusters=k, random_state=random_state, n_init=10)
+
+class ClusteringPipeline:
+    def __init__(self, random_state=42):
+        self.random_state = random_state
+        self.feature_columns = None
+        self.imputer = None
+        self.scaler = None
+        self.kmeans = None
+        self.pca = None
+        self.assignments = None
+
+    def fit_preprocessing(self, df):
+        numeric = df.select_dtypes(include=[np.number])
+        self.feature_columns = list(numeric.columns)
+        self.imputer = SimpleImputer(strategy='mean').fit(numeric)
+        self.scaler = StandardScaler().fit(self.imputer.transform(numeric))
+        return self.scaler.transform(self.imputer.transform(numeric))
+
+    def transform(self, df):
+        features = df.reindex(columns=self.feature_columns).astype(float)
+        return self.scaler.transform(self.imputer.transform(features))
+
+    def fit(self, df, k, minibatch=False, X=None):
+        X = self.fit_preprocessing(df) if X is None else X
+        self.kmeans = make_kmeans(k, minibatch, self.random_state)
+        labels = self.kmeans.fit_predict(X)
+        self.pca = PCA(n_components=2).fit(X)
+        self.assignments = self.assignment_frame(df, X, labels)
+        return self
+
+    @property
+    def k(self):
+        return self.kmeans.n_clusters
+
+    def row_hashes(self, df):
+        features = df.reindex(columns=self.feature_columns)
+        return pd.util.hash_pandas_object(features, index=False).to_numpy()
+
+    def assignment_frame(self, df, X, labels):
+        coords = self.pca.transform(X)
+        return pd.DataFrame({
+            'Key': player_keys(df).to_numpy(),
+            'Name': df['Name'].to_numpy(),
+            'Cluster': labels,
+            'PC1': coords[:, 0],
+            'PC2': coords[:, 1],
+            'RowHash': self.row_hashes(df)
+        })
+
+    def assign(self, df, batch_size=4096):
+        frames = []
+        for start in range(0, len(df), batch_size):
+            batch = df.iloc[start:start + batch_size]
+            X = self.transform(batch)
+            frames.append(self.assignment_frame(batch, X, self.kmeans.predict(X)))
+        return pd.concat(frames, ignore_index=True) if frames else self.assignments.iloc[0:0]
+
+    def update(self, df, batch_size=4096):
+        keys, hashes = player_keys(df).to_numpy(), self.row_hashes(df)
+        previous = self.assignments.set_index('Key')['RowHash']
+        previous = previous[~previous.index.duplicated(keep=False)]
+        known = pd.Series(keys).map(previous).to_numpy()
+        changed = pd.isna(known) | (known != hashes) | pd.Series(keys).duplicated(keep=False).to_numpy()
+
+        removed = int((~self.assignments['Key'].isin(keys)).sum())
+        kept = self.assignments[self.assignments['Key'].isin(keys[~changed])]
+        self.assignments = pd.concat([kept, self.assign(df[changed], batch_size)], ignore_index=True)
+        return int(changed.sum()), removed
+
+    def matches(self, df):
+        return list(df.select_dtypes(include=[np.number]).columns) == self.feature_columns
+
+    def save(self, path=CLUSTER_MODEL):
+        tmp_path = f"{path}.tmp"
+        joblib.dump(self, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=CLUSTER_MODEL):
+        model = joblib.load(path)
+        if not isinstance(model, cls):
+            raise ValueError(f"{path} does not contain a clustering pipeline")
+        return model
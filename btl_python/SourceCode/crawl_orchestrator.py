@@ -0,0 +1,129 @@
+import argparse
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from Bai_1 import (FootballDataScraper, PlayerStore, parse_team_page, build_results_frame,
+                   write_results_csv, build_arg_parser, scraper_options)
+from data_loader import partition_dir, write_results_arrow
+
+CrawlTarget = namedtuple('CrawlTarget', ['competition_id', 'season', 'slug'])
+
+def parse_target(text):
+    try:
+        competition_id, season, slug = text.split(':')
+        return CrawlTarget(int(competition_id), season, slug)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid target '{text}', expected <competition_id>:<season>:<slug> "
+                         f"e.g. 9:2024-2025:Premier-League")
+
+def target_label(target):
+    return f"{target.slug.replace('-', ' ')} {target.season}"
+
+def league_url(base_url, target):
+    return f"{base_url}/en/comps/{target.competition_id}/{target.season}/{target.season}-{target.slug}-Stats"
+
+def results_table_id(target):
+    return f"results{target.season}{target.competition_id}1_overall"
+
+def partition_path(output_dir, target):
+    return partition_dir(output_dir, target.competition_id, target.season)
+
+class CrawlOrchestrator:
+    def __init__(self, targets, output_dir='results_dataset', **scraper_kwargs):
+        self.targets = list(dict.fromkeys(targets))
+        self.output_dir = output_dir
+        self.scraper = FootballDataScraper(**scraper_kwargs)
+        self.stores = {target: PlayerStore() for target in self.targets}
+
+    def crawl_team_links(self, target):
+        league_html = self.scraper.fetch_page(league_url(self.scraper.base_url, target))
+        if not league_html:
+            print(f"Failed to fetch league page for {target_label(target)}")
+            return {}
+
+        try:
+            return self.scraper.extract_team_links(league_html, results_table_id(target))
+        except ValueError as e:
+            print(f"Error extracting team links for {target_label(target)}: {e}")
+            return {}
+
+    def crawl_team(self, target, team_name, team_url):
+        team_html = self.scraper.fetch_page(team_url)
+        if not team_html:
+            print(f"Failed to fetch data for {team_name} ({target_label(target)})")
+            return
+
+        records, missing, elapsed, content_hash = parse_team_page(self.scraper.parser, team_name,
+                                                                  team_html, target.competition_id)
+        if missing:
+            print(f"Tables not found for {team_name} ({target_label(target)}): {', '.join(missing)}")
+
+        self.stores[target].add_team(team_name, records, content_hash)
+        self.scraper.record_timing('parsing', elapsed)
+
+    def run(self):
+        print(f"Starting crawl of {len(self.targets)} targets...")
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.scraper.max_concurrency) as executor:
+            link_futures = {executor.submit(self.crawl_team_links, target): target for target in self.targets}
+            team_futures = {}
+
+            for future in as_completed(link_futures):
+                target = link_futures[future]
+                try:
+                    team_links = future.result()
+                except Exception as e:
+                    print(f"Error crawling {target_label(target)}: {e}")
+                    continue
+                print(f"{target_label(target)}: found {len(team_links)} teams")
+                for team_name, team_url in team_links.items():
+                    team_futures[executor.submit(self.crawl_team, target, team_name, team_url)] = (target, team_name)
+
+            for i, future in enumerate(as_completed(team_futures), 1):
+                target, team_name = team_futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error processing {team_name} ({target_label(target)}): {e}")
+                print(f"Finished team {i}/{len(team_futures)}: {team_name} ({target_label(target)})")
+
+        self.export()
+        print("\nCrawl completed!")
+        self.scraper.report_timings(time.perf_counter() - started)
+        if self.scraper.cache:
+            self.scraper.cache.flush()
+            print(self.scraper.cache.summary())
+
+    def export(self):
+        for target, store in self.stores.items():
+            players = store.merged()
+            if not players:
+                print(f"No player data to export for {target_label(target)}")
+                continue
+
+            path = partition_path(self.output_dir, target)
+            os.makedirs(path, exist_ok=True)
+            filename = os.path.join(path, 'results.csv')
+            df = build_results_frame(players)
+            write_results_csv(df, filename)
+            write_results_arrow(df, os.path.join(path, 'results.arrow'))
+            print(f"{target_label(target)}: {len(players)} players exported to {filename}")
+
+if __name__ == "__main__":
+    parser = build_arg_parser()
+    parser.description = "Crawl several FBref competitions and seasons into one partitioned dataset"
+    parser.add_argument('--target', action='append', type=parse_target, required=True,
+                        help="<competition_id>:<season>:<slug>, e.g. 12:2023-2024:La-Liga (repeatable)")
+    parser.add_argument('--output-dir', default='results_dataset',
+                        help="root directory of the partitioned dataset, readable as one table with "
+                             "data_loader.load_results(<output-dir>)")
+    args = parser.parse_args()
+
+    options = scraper_options(args)
+    options['checkpoint_path'] = None
+    options['incremental'] = False
+    orchestrator = CrawlOrchestrator(args.target, output_dir=args.output_dir, **options)
+    orchestrator.run()
@@ -0,0 +1,186 @@
+import glob
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:
+    pa = None
+
+INFO_COLUMNS = ['Name', 'PlayerID', 'Team', 'Nation', 'Position', 'Age']
+PARTITION_COLUMNS = ['competition', 'season']
+TEXT_COLUMNS = INFO_COLUMNS + PARTITION_COLUMNS + ['Change']
+ARROW_RESULTS = 'results.arrow'
+CSV_RESULTS = 'results.csv'
+DELTA_RESULTS = 'results_delta.csv'
+MANIFEST = 'results_manifest.json'
+ARROW_BATCH_ROWS = 65536
+
+def results_schema(columns: List[str]) -> 'pa.Schema':
+    return pa.schema([
+        pa.field(col, pa.string() if col in TEXT_COLUMNS else pa.float64())
+        for col in columns
+    ])
+
+def write_results_arrow(df: pd.DataFrame, file_path: str = ARROW_RESULTS) -> bool:
+    if pa is None:
+        print("pyarrow is not installed, skipping Arrow export")
+        return False
+
+    table = pa.Table.from_pandas(df, schema=results_schema(list(df.columns)), preserve_index=False)
+    tmp_path = f"{file_path}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=ARROW_BATCH_ROWS)
+    os.replace(tmp_path, file_path)
+    return True
+
+def default_results_path(directory: str = '.') -> str:
+    arrow_path = os.path.join(directory, ARROW_RESULTS)
+    if pa is not None and os.path.exists(arrow_path):
+        return arrow_path
+    return os.path.join(directory, CSV_RESULTS)
+
+def read_arrow(file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    table = pa.ipc.open_file(pa.memory_map(file_path, 'r')).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas()
+
+def coerce_numeric(df: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    if columns is not None:
+        df = df[columns]
+    for col in df.columns:
+        if col not in TEXT_COLUMNS and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', '').str.rstrip('%'), errors='coerce')
+    return df
+
+def read_csv(file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    df = pd.read_csv(file_path, usecols=columns, encoding='utf-8-sig',
+                     dtype={col: str for col in TEXT_COLUMNS})
+    return coerce_numeric(df, columns)
+
+def partition_dir(root: str, competition: str, season: str) -> str:
+    return os.path.join(root, f"competition={competition}", f"season={season}")
+
+def dataset_partitions(root: str) -> List[Tuple[Dict[str, str], str]]:
+    partitions = []
+    for path in sorted(glob.glob(partition_dir(glob.escape(root), '*', '*'))):
+        if os.path.isdir(path):
+            parts = os.path.relpath(path, root).split(os.sep)
+            partitions.append((dict(part.split('=', 1) for part in parts), default_results_path(path)))
+    if not partitions:
+        raise FileNotFoundError(f"No competition=/season= partitions found under {root}")
+    return partitions
+
+def file_columns(columns: Optional[List[str]]) -> Optional[List[str]]:
+    return None if columns is None else [col for col in columns if col not in PARTITION_COLUMNS]
+
+def with_partition(df: pd.DataFrame, values: Dict[str, str], columns: Optional[List[str]]) -> pd.DataFrame:
+    df = pd.concat([pd.DataFrame(values, index=df.index), df], axis=1)
+    return df if columns is None else df[columns]
+
+def read_dataset(root: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    frames = [with_partition(load_results(path, file_columns(columns)), values, columns)
+              for values, path in dataset_partitions(root)]
+    return pd.concat(frames, ignore_index=True)
+
+def load_results(file_path: Optional[str] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    file_path = file_path or default_results_path()
+    if os.path.isdir(file_path):
+        return read_dataset(file_path, columns)
+    if file_path.endswith('.arrow'):
+        return read_arrow(file_path, columns)
+    return read_csv(file_path, columns)
+
+def iter_results(file_path: Optional[str] = None, columns: Optional[List[str]] = None,
+                 chunk_rows: int = 50000) -> Iterator[pd.DataFrame]:
+    file_path = file_path or default_results_path()
+    if os.path.isdir(file_path):
+        for values, path in dataset_partitions(file_path):
+            for chunk in iter_results(path, file_columns(columns), chunk_rows):
+                yield with_partition(chunk, values, columns)
+        return
+    
+    if file_path.endswith('.arrow'):
+        table = pa.ipc.open_file(pa.memory_map(file_path, 'r')).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        for offset in range(0, table.num_rows, chunk_rows):
+            yield table.slice(offset, chunk_rows).to_pandas()
+        return
+    
+    with pd.read_csv(file_path, usecols=columns, encoding='utf-8-sig', chunksize=chunk_rows,
+                     dtype={col: str for col in TEXT_COLUMNS}) as reader:
+        for chunk in reader:
+            yield coerce_numeric(chunk, columns)
+
+def player_keys(df: pd.DataFrame) -> pd.Series:
+    if 'PlayerID' not in df.columns:
+        return df['Name'].astype(str).rename('Key')
+    ids = df['PlayerID'].fillna('N/A').astype(str)
+    fallback = 'N/A:' + df['Name'].astype(str) + '|' + df['Team'].fillna('N/A').astype(str)
+    return ids.where(ids != 'N/A', fallback).rename('Key')
+
+class PlayerIndex:
+    def __init__(self, entries=()):
+        self.by_key = {}
+        self.names = {}
+        self.by_name = {}
+        for key, name, item in entries:
+            self.add(key, name, item)
+
+    def add(self, key, name: str, item) -> None:
+        self.remove(key)
+        self.by_key[key] = item
+        self.names[key] = name
+        self.by_name.setdefault(name, set()).add(key)
+
+    def remove(self, key) -> None:
+        if key not in self.by_key:
+            return
+        del self.by_key[key]
+        name = self.names.pop(key)
+        self.by_name[name].discard(key)
+        if not self.by_name[name]:
+            del self.by_name[name]
+
+    def find_by_name(self, name: str) -> list:
+        return sorted(self.by_name.get(name, ()), key=str)
+
+    def values(self):
+        return self.by_key.values()
+
+    def __getitem__(self, key):
+        return self.by_key[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self.by_key
+
+    def __iter__(self):
+        return iter(self.by_key)
+
+    def __len__(self) -> int:
+        return len(self.by_key)
+
+def read_manifest(file_path: str = MANIFEST) -> Optional[dict]:
+    try:
+        with open(file_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def current_snapshot(manifest_path: str = MANIFEST) -> Optional[str]:
+    manifest = read_manifest(manifest_path)
+    return manifest.get('snapshot') if manifest else None
+
+def applicable_delta(state_snapshot: Optional[str], manifest_path: str = MANIFEST,
+                     delta_path: str = DELTA_RESULTS) -> Optional[str]:
+    manifest = read_manifest(manifest_path)
+    if (manifest and state_snapshot and manifest.get('previous_snapshot') == state_snapshot
+            and os.path.exists(delta_path)):
+        return delta_path
+    return None
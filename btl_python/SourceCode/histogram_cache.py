@@ -0,0 +1,103 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_loader import load_results
+
+HISTOGRAM_CACHE = 'histograms.npz'
+TEAM_BINS = 10
+ALL_BINS = 20
+
+def grouped_histograms(values, codes, n_groups, bins):
+    order = np.argsort(codes, kind='stable')
+    sorted_values, sorted_codes = values[order], codes[order]
+    starts = np.searchsorted(sorted_codes, np.arange(n_groups))
+    present = np.bincount(codes, minlength=n_groups) > 0
+
+    missing = np.isnan(sorted_values)
+    lows = np.full((n_groups, values.shape[1]), np.inf)
+    highs = np.full((n_groups, values.shape[1]), -np.inf)
+    lows[present] = np.minimum.reduceat(np.where(missing, np.inf, sorted_values), starts[present], axis=0)
+    highs[present] = np.maximum.reduceat(np.where(missing, -np.inf, sorted_values), starts[present], axis=0)
+
+    empty = lows > highs
+    lows, highs = np.where(empty, 0.0, lows), np.where(empty, 1.0, highs)
+    flat = lows == highs
+    lows, highs = np.where(flat, lows - 0.5, lows), np.where(flat, highs + 0.5, highs)
+
+    edges = lows[..., None] + np.arange(bins + 1) * ((highs - lows) / bins)[..., None]
+    edges[..., -1] = highs
+
+    valid = ~np.isnan(values)
+    row_lows, row_edges = lows[codes], edges[codes]
+    filled = np.where(valid, values, row_lows)
+    with np.errstate(invalid='ignore'):
+        index = ((filled - row_lows) * (bins / (highs - lows))[codes]).astype(np.intp)
+    index = np.clip(index, 0, bins - 1)
+
+    lower = np.take_along_axis(row_edges, index[..., None], axis=2)[..., 0]
+    index -= filled < lower
+    upper = np.take_along_axis(row_edges, (index + 1)[..., None], axis=2)[..., 0]
+    index += (filled >= upper) & (index != bins - 1)
+
+    n_stats = values.shape[1]
+    cells = (codes[:, None] * n_stats + np.arange(n_stats)) * bins + index
+    counts = np.bincount(cells[valid], minlength=n_groups * n_stats * bins)
+    return edges, counts.reshape(n_groups, n_stats, bins)
+
+def dataset_hash(file_path, stats, team_bins=TEAM_BINS, all_bins=ALL_BINS):
+    digest = hashlib.sha1(repr((stats, team_bins, all_bins)).encode('utf-8'))
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def compute_histograms(df, stats, team_bins=TEAM_BINS, all_bins=ALL_BINS):
+    values = df[stats].to_numpy(dtype=float)
+    all_edges, all_counts = grouped_histograms(values, np.zeros(len(df), dtype=np.intp), 1, all_bins)
+
+    codes, teams = pd.factorize(df['Team'], sort=True)
+    rows = codes >= 0
+    team_edges, team_counts = grouped_histograms(values[rows], codes[rows], len(teams), team_bins)
+
+    return {
+        'stats': np.array(stats),
+        'teams': np.asarray(teams, dtype=str),
+        'all_edges': all_edges[0],
+        'all_counts': all_counts[0],
+        'team_edges': team_edges,
+        'team_counts': team_counts
+    }
+
+def save_histograms(histograms, key, cache_path=HISTOGRAM_CACHE):
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, key=np.array(key), **histograms)
+    os.replace(tmp_path, cache_path)
+
+def load_histograms(cache_path=HISTOGRAM_CACHE, key=None):
+    try:
+        with np.load(cache_path) as data:
+            histograms = {name: data[name] for name in data.files}
+    except (OSError, ValueError, KeyError):
+        return None
+
+    if key is not None and str(histograms.pop('key', '')) != key:
+        return None
+    histograms.pop('key', None)
+    return histograms
+
+def cached_histograms(input_file, stats, cache_path=HISTOGRAM_CACHE, team_bins=TEAM_BINS, all_bins=ALL_BINS):
+    key = dataset_hash(input_file, stats, team_bins, all_bins)
+    histograms = load_histograms(cache_path, key)
+    if histograms is not None:
+        print(f"Using cached histograms from {cache_path}")
+        return histograms
+
+    df = load_results(input_file, columns=['Team'] + list(stats))
+    histograms = compute_histograms(df, list(stats), team_bins, all_bins)
+    save_histograms(histograms, key, cache_path)
+    print(f"Histograms computed and cached in {cache_path}")
+    return histograms
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+class HttpCache:
+    def __init__(self, directory='.http_cache', max_bytes=200 * 1024 * 1024, ttl=6 * 3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.index_path = os.path.join(directory, 'index.json')
+        self.lock = threading.Lock()
+        self.counts = {'hits': 0, 'revalidated': 0, 'misses': 0}
+        self.dirty = False
+
+        os.makedirs(directory, exist_ok=True)
+        self.entries = self.load_index()
+
+    def load_index(self):
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        return {url: entry for url, entry in entries.items()
+                if os.path.exists(os.path.join(self.directory, entry['file']))}
+
+    def save_index(self):
+        self.dirty = False
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.index_path)
+
+    def lookup(self, url):
+        with self.lock:
+            entry = self.entries.get(url)
+            return dict(entry) if entry else None
+
+    def is_fresh(self, entry):
+        return time.time() - entry['stored_at'] < self.ttl
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def read(self, url, entry, outcome):
+        try:
+            with open(os.path.join(self.directory, entry['file']), encoding='utf-8') as f:
+                body = f.read()
+        except OSError:
+            self.discard(url)
+            return None
+
+        with self.lock:
+            if url in self.entries:
+                self.entries[url]['last_access'] = time.time()
+                if outcome == 'revalidated':
+                    self.entries[url]['stored_at'] = time.time()
+            self.counts[outcome] += 1
+            self.dirty = True
+        return body
+
+    def flush(self):
+        with self.lock:
+            if self.dirty:
+                self.save_index()
+
+    def store(self, url, body, headers):
+        filename = hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html'
+        data = body.encode('utf-8')
+        with open(os.path.join(self.directory, filename), 'wb') as f:
+            f.write(data)
+
+        now = time.time()
+        with self.lock:
+            self.entries[url] = {
+                'file': filename,
+                'size': len(data),
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'stored_at': now,
+                'last_access': now
+            }
+            self.counts['misses'] += 1
+            self.evict()
+            self.save_index()
+
+    def discard(self, url):
+        with self.lock:
+            entry = self.entries.pop(url, None)
+            if entry:
+                self.remove_file(entry)
+                self.save_index()
+
+    def remove_file(self, entry):
+        try:
+            os.remove(os.path.join(self.directory, entry['file']))
+        except OSError:
+            pass
+
+    def evict(self):
+        total = sum(entry['size'] for entry in self.entries.values())
+        for url, entry in sorted(self.entries.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            total -= entry['size']
+            self.remove_file(entry)
+            del self.entries[url]
+
+    def summary(self):
+        return (f"Cache: {self.counts['hits']} hits, {self.counts['revalidated']} revalidated, "
+                f"{self.counts['misses']} misses ({len(self.entries)} entries)")
@@ -0,0 +1,142 @@
+import os
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import argparse
+import contextlib
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+stages = {
+    'scrape': [],
+    'report': ['scrape'],
+    'aggregates': ['scrape'],
+    'scoring': ['aggregates'],
+    'histograms': ['scrape'],
+    'clustering': ['scrape']
+}
+
+def stage_scrape(options):
+    from Bai_1 import FootballDataScraper, build_arg_parser, scraper_options
+    FootballDataScraper(**scraper_options(build_arg_parser().parse_args([]))).run()
+
+def stage_report(options):
+    from Bai_2_a import run_report
+    from data_loader import default_results_path
+    run_report(default_results_path(), f"top_{options.top}.txt", f"top_{options.top}_state.json", options.top)
+
+def stage_aggregates(options):
+    from Bai_2_b import run_analysis
+    from data_loader import default_results_path
+    run_analysis(default_results_path())
+
+def stage_scoring(options):
+    from Bai_2_d import analyze_premier_league_stats, load_profiles
+    if analyze_premier_league_stats('results2.csv', load_profiles(options.profiles), options.normalize) is None:
+        raise RuntimeError("team scoring produced no report")
+
+def stage_histograms(options):
+    from Bai_2_c import run_histograms
+    from data_loader import default_results_path
+    run_histograms(default_results_path(), workers=options.stage_workers)
+
+def stage_clustering(options):
+    from Bai_3 import build_arg_parser, run_clustering
+    args = build_arg_parser().parse_args([])
+    args.workers = options.stage_workers
+    run_clustering(args)
+
+stage_functions = {
+    'scrape': stage_scrape,
+    'report': stage_report,
+    'aggregates': stage_aggregates,
+    'scoring': stage_scoring,
+    'histograms': stage_histograms,
+    'clustering': stage_clustering
+}
+
+def run_stage(name, options):
+    started = time.perf_counter()
+    os.makedirs(options.log_dir, exist_ok=True)
+    with open(os.path.join(options.log_dir, f"{name}.log"), 'w', encoding='utf-8') as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            stage_functions[name](options)
+        except BaseException:
+            traceback.print_exc()
+            return name, False, time.perf_counter() - started
+    return name, True, time.perf_counter() - started
+
+def plan_stages(selected):
+    required = set()
+    pending = list(selected)
+    while pending:
+        name = pending.pop()
+        if name not in required:
+            required.add(name)
+            pending.extend(stages[name])
+    return [name for name in stages if name in required]
+
+def run_pipeline(options):
+    plan = plan_stages(options.stages)
+    if not options.scrape:
+        plan = [name for name in plan if name != 'scrape']
+
+    finished, failed, elapsed, finish_times = set(), set(), {}, {}
+    running = {}
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=options.workers) as executor:
+        while len(finished) + len(failed) < len(plan):
+            for name in plan:
+                if name in running.values() or name in finished or name in failed:
+                    continue
+                if any(dep in failed for dep in stages[name]):
+                    failed.add(name)
+                    print(f"[skip] {name}: depends on a failed stage")
+                elif all(dep in finished for dep in stages[name] if dep in plan):
+                    running[executor.submit(run_stage, name, options)] = name
+
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, ok, seconds = future.result()
+                del running[future]
+                elapsed[name] = seconds
+                finish_times[name] = time.perf_counter() - started
+                (finished if ok else failed).add(name)
+                status = 'done' if ok else f"FAILED, see {os.path.join(options.log_dir, name + '.log')}"
+                print(f"[{finish_times[name]:7.1f}s] {name:<11} {seconds:6.1f}s  {status}")
+
+    total = time.perf_counter() - started
+    critical = {}
+    for name in plan:
+        critical[name] = elapsed.get(name, 0.0) + max((critical[dep] for dep in stages[name] if dep in plan), default=0.0)
+    print(f"Finished {len(finished)} of {len(plan)} stages in {total:.1f}s "
+          f"(critical path {max(critical.values(), default=0.0):.1f}s, sequential {sum(elapsed.values()):.1f}s)")
+    return not failed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the whole analysis headlessly, independent stages in parallel")
+    parser.add_argument('stages', nargs='*', metavar='stage',
+                        help=f"one of {', '.join(stages)}; stages to run, together with the stages they depend on (default: all but scrape)")
+    parser.add_argument('--scrape', action='store_true', help="scrape fresh data first (implied by naming 'scrape')")
+    parser.add_argument('--workers', type=int, default=None, help="stages running at once (default: CPU count)")
+    parser.add_argument('--stage-workers', type=int, default=1,
+                        help="processes each histogram or clustering stage may use itself")
+    parser.add_argument('--top', type=int, default=3, help="players listed at each end of every statistic")
+    parser.add_argument('--profiles', help="weight profiles JSON for the scoring stage")
+    parser.add_argument('--normalize', choices=['raw', 'zscore', 'minmax', 'percentile'], default='raw')
+    parser.add_argument('--log-dir', default='batch_logs', help="directory for one log file per stage")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.stages if name not in stages]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    args.scrape = args.scrape or 'scrape' in args.stages
+    args.stages = args.stages or [name for name in stages if name != 'scrape']
+    if not run_pipeline(args):
+        raise SystemExit(1)
@@ -0,0 +1,124 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import PCA
+from sklearn.neighbors import BallTree
+
+from cluster_model import ClusteringPipeline, CLUSTER_MODEL
+from data_loader import PlayerIndex, load_results, player_keys
+
+EXACT_MAX_ROWS = 20000
+
+def normalize_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+class SimilarityIndex:
+    def __init__(self, vectors, players, method='auto', n_components=12, random_state=42):
+        self.vectors = np.ascontiguousarray(normalize_rows(np.asarray(vectors, dtype=float)))
+        self.players = players.reset_index(drop=True)
+        self.keys = player_keys(self.players).to_numpy()
+        self.teams = self.players['Team'].fillna('').astype(str).to_numpy()
+        self.index = PlayerIndex(zip(self.keys, self.players['Name'], range(len(self.keys))))
+        positions = self.players['Position'].fillna('').astype(str).str.get_dummies(sep=',')
+        self.position_masks = {position: positions[position].to_numpy(dtype=bool) for position in positions.columns}
+        self.team_rows = pd.Series(self.teams).groupby(self.teams).indices
+
+        if method == 'auto':
+            method = 'exact' if len(self.vectors) <= EXACT_MAX_ROWS else 'approximate'
+        self.method = method
+        self.tree = None
+
+        if method == 'approximate':
+            n_components = min(n_components, *self.vectors.shape)
+            self.pca = PCA(n_components=n_components, random_state=random_state).fit(self.vectors)
+            self.tree = BallTree(normalize_rows(self.pca.transform(self.vectors)))
+
+    @classmethod
+    def from_dataframe(cls, df, model=None, **kwargs):
+        if model is None:
+            model = ClusteringPipeline()
+            vectors = model.fit_preprocessing(df)
+        else:
+            vectors = model.transform(df)
+        return cls(vectors, df[[col for col in ('Name', 'PlayerID', 'Team', 'Position') if col in df.columns]], **kwargs)
+
+    def locate(self, player):
+        if player in self.index:
+            return self.index[player]
+        keys = self.index.find_by_name(player)
+        if not keys:
+            raise KeyError(f"Player '{player}' not found")
+        if len(keys) > 1:
+            choices = ', '.join(f"{key} ({self.teams[self.index[key]]})" for key in keys)
+            raise ValueError(f"'{player}' matches several players, pass one of: {choices}")
+        return self.index[keys[0]]
+
+    def filter_mask(self, position=None, team=None):
+        mask = np.ones(len(self.vectors), dtype=bool)
+        if team is not None:
+            team_mask = np.zeros(len(self.vectors), dtype=bool)
+            team_mask[self.team_rows.get(team, [])] = True
+            mask &= team_mask
+        if position is not None:
+            mask &= self.position_masks.get(position, np.zeros(len(self.vectors), dtype=bool))
+        return mask
+
+    def candidates(self, row, k, mask):
+        query = normalize_rows(self.pca.transform(self.vectors[row:row + 1]))
+        wanted = min(len(self.vectors), max(4 * k, 32))
+        while True:
+            found = self.tree.query(query, k=wanted, return_distance=False)[0]
+            found = found[mask[found]]
+            if len(found) > k or wanted == len(self.vectors):
+                return found
+            wanted = min(len(self.vectors), wanted * 4)
+
+    def query(self, player, k=10, position=None, team=None):
+        row = self.locate(player)
+        mask = self.filter_mask(position, team)
+        mask[row] = False
+
+        if self.tree is None:
+            found = np.flatnonzero(mask)
+            scores = (self.vectors @ self.vectors[row])[found]
+        else:
+            found = self.candidates(row, k, mask)
+            scores = self.vectors[found] @ self.vectors[row]
+
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        top = top[np.lexsort((found[top], -scores[top]))]
+
+        result = self.players.iloc[found[top]].copy()
+        result['Similarity'] = scores[top]
+        return result.reset_index(drop=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the players most similar to a given player")
+    parser.add_argument('player', help="player name or FBref player id")
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--position', help="only players listed at this position, e.g. DF")
+    parser.add_argument('--team', help="only players of this team")
+    parser.add_argument('--method', choices=['auto', 'exact', 'approximate'], default='auto')
+    parser.add_argument('--model', default=CLUSTER_MODEL,
+                        help="saved clustering pipeline whose scaling is reused, if present")
+    args = parser.parse_args()
+
+    df = load_results()
+    model = ClusteringPipeline.load(args.model) if os.path.exists(args.model) else None
+    if model is not None and not model.matches(df):
+        model = None
+    index = SimilarityIndex.from_dataframe(df, model, method=args.method)
+
+    started = time.perf_counter()
+    try:
+        matches = index.query(args.player, args.top, args.position, args.team)
+    except (KeyError, ValueError) as e:
+        parser.exit(1, f"{e.args[0]}\n")
+    elapsed = (time.perf_counter() - started) * 1000
+
+    print(matches.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+    print(f"\n{index.method} search over {len(df)} players in {elapsed:.1f} ms")
@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Bai_1 import write_results_csv
+from data_loader import iter_results, load_results, partition_dir, write_results_arrow
+
+def season_frame(names, goals):
+    return pd.DataFrame({
+        'Name': names,
+        'PlayerID': [name.encode('utf-8').hex()[:8] for name in names],
+        'Team': 'Wolves',
+        'performance_goals': np.array(goals, dtype=float)
+    })
+
+@pytest.fixture
+def dataset(tmp_path):
+    partitions = {
+        ('9', '2023-2024'): season_frame(['Ann Able', 'Bea Bell'], [3, 5]),
+        ('9', '2024-2025'): season_frame(['Ann Able'], [7]),
+        ('12', '2024-2025'): season_frame(['Cat Cole', 'Dee Dunn', 'Eve Eng'], [1, np.nan, 2])
+    }
+    for (competition, season), df in partitions.items():
+        path = partition_dir(str(tmp_path), competition, season)
+        os.makedirs(path)
+        if competition == '12':
+            write_results_arrow(df, os.path.join(path, 'results.arrow'))
+        else:
+            write_results_csv(df, os.path.join(path, 'results.csv'))
+    return str(tmp_path)
+
+def test_partitioned_dataset_loads_as_one_table(dataset):
+    df = load_results(dataset)
+
+    assert list(df.columns[:2]) == ['competition', 'season']
+    assert df[['competition', 'season', 'Name']].values.tolist() == [
+        ['12', '2024-2025', 'Cat Cole'], ['12', '2024-2025', 'Dee Dunn'], ['12', '2024-2025', 'Eve Eng'],
+        ['9', '2023-2024', 'Ann Able'], ['9', '2023-2024', 'Bea Bell'], ['9', '2024-2025', 'Ann Able']
+    ]
+    assert df['performance_goals'].isna().sum() == 1
+
+def test_partitioned_dataset_streams_in_chunks(dataset):
+    columns = ['season', 'Name', 'performance_goals']
+    chunks = list(iter_results(dataset, columns, chunk_rows=2))
+
+    assert all(list(chunk.columns) == columns for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), load_results(dataset, columns))
+
+def test_missing_partitions_are_reported(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_results(str(tmp_path))
@@ -0,0 +1,108 @@
+import http.server
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from Bai_1 import FootballDataScraper
+from http_cache import HttpCache
+
+PAGE = '<html><body><table id="stats_standard_9"></table></body></html>'
+LAST_MODIFIED = 'Wed, 01 Oct 2025 10:00:00 GMT'
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    validators = {'etag': True, 'last_modified': True}
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(dict(self.headers))
+        etag = '"v1"' if self.validators['etag'] else None
+        last_modified = LAST_MODIFIED if self.validators['last_modified'] else None
+
+        if (etag and self.headers.get('If-None-Match') == etag) or \
+                (last_modified and self.headers.get('If-Modified-Since') == last_modified):
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = PAGE.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        if last_modified:
+            self.send_header('Last-Modified', last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    StubHandler.requests = []
+    StubHandler.validators = {'etag': True, 'last_modified': True}
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/team"
+    httpd.shutdown()
+    httpd.server_close()
+
+def make_scraper(cache):
+    scraper = FootballDataScraper(cache=cache)
+    scraper.request_delay = (0, 0)
+    return scraper
+
+def test_fresh_entry_is_served_without_a_request(server, tmp_path):
+    cache = HttpCache(str(tmp_path), ttl=3600)
+    scraper = make_scraper(cache)
+
+    assert scraper.fetch_page(server) == PAGE
+    assert scraper.fetch_page(server) == PAGE
+    assert len(StubHandler.requests) == 1
+    assert cache.counts == {'hits': 1, 'revalidated': 0, 'misses': 1}
+
+@pytest.mark.parametrize('validator, header, value', [
+    ('etag', 'If-None-Match', '"v1"'),
+    ('last_modified', 'If-Modified-Since', LAST_MODIFIED)
+])
+def test_stale_entry_is_revalidated(server, tmp_path, validator, header, value):
+    StubHandler.validators = {'etag': False, 'last_modified': False, validator: True}
+    cache = HttpCache(str(tmp_path), ttl=0)
+    scraper = make_scraper(cache)
+
+    assert scraper.fetch_page(server) == PAGE
+    assert scraper.fetch_page(server) == PAGE
+    assert len(StubHandler.requests) == 2
+    assert StubHandler.requests[1].get(header) == value
+    assert cache.counts == {'hits': 0, 'revalidated': 1, 'misses': 1}
+
+def test_least_recently_used_page_is_evicted(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=250)
+    for url in ('a', 'b'):
+        cache.store(url, 'x' * 100, {})
+        time.sleep(0.01)
+    cache.read('a', cache.lookup('a'), 'hits')
+    time.sleep(0.01)
+    cache.store('c', 'x' * 100, {})
+
+    assert sorted(cache.entries) == ['a', 'c']
+    assert len(os.listdir(tmp_path)) == 3
+    assert sorted(HttpCache(str(tmp_path)).entries) == ['a', 'c']
+
+def test_hits_do_not_rewrite_the_index(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    cache.store('a', PAGE, {})
+    index_path = os.path.join(tmp_path, 'index.json')
+    os.remove(index_path)
+
+    assert cache.read('a', cache.lookup('a'), 'hits') == PAGE
+    assert not os.path.exists(index_path)
+
+    cache.flush()
+    with open(index_path, encoding='utf-8') as f:
+        assert json.load(f)['a']['last_access'] == cache.entries['a']['last_access']
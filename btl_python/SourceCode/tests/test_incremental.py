@@ -0,0 +1,102 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Bai_2_b
+from Bai_1 import FootballDataScraper, PlayerRecord, STAT_COLUMNS, build_results_frame, compute_delta, stat_table_id
+from data_loader import CSV_RESULTS, DELTA_RESULTS, MANIFEST, load_results, player_keys, read_manifest
+
+def team_page(players):
+    rows = ''.join(
+        f'<tr><th data-stat="player"><a href="/en/players/{player_id}/{name.replace(" ", "-")}">{name}</a></th>'
+        f'<td data-stat="nationality">eng ENG</td><td data-stat="position">MF</td><td data-stat="age">25-100</td>'
+        f'<td data-stat="minutes">{minutes:,}</td><td data-stat="goals">{goals}</td></tr>'
+        for name, player_id, minutes, goals in players
+    )
+    return f'<html><body><table id="{stat_table_id("standard")}"><tbody>{rows}</tbody></table></body></html>'
+
+JOE = ('Joe Bloggs', '0000a001', 1200, 4)
+SAM = ('Sam Smith', '0000a002', 1000, 2)
+
+BEFORE = {
+    'Wolves': team_page([('Joe Bloggs', '0000a001', 30, 0), ('Will Wood', '0000a003', 2000, 1)]),
+    'Chelsea': team_page([JOE, SAM, ('Carl Cook', '0000a004', 900, 0)]),
+    'Arsenal': team_page([('Sam Smith', '0000a002', 800, 1), ('Alan Ash', '0000a005', 1500, 7)])
+}
+
+AFTER = [
+    dict(BEFORE, Chelsea=team_page([JOE, SAM, ('Carl Cook', '0000a004', 990, 1)])),
+    dict(BEFORE, Chelsea=team_page([JOE, ('Carl Cook', '0000a004', 990, 1)])),
+    dict(BEFORE, Wolves=team_page([('Joe Bloggs', '0000a001', 120, 0), ('Will Wood', '0000a003', 2090, 1)])),
+    dict(BEFORE, Arsenal=team_page([('Alan Ash', '0000a005', 1590, 8)])),
+    dict(BEFORE, Wolves=team_page([('Joe Bloggs', '0000a001', 1300, 0), ('Will Wood', '0000a003', 2000, 1)]))
+]
+
+def scrape(directory, pages, incremental, analyze=False):
+    os.makedirs(directory, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        scraper = FootballDataScraper(incremental=incremental)
+        scraper.load_previous_snapshot()
+        for team_name, html in pages.items():
+            scraper.process_team_html(team_name, html)
+        scraper.finish_run({}, time.perf_counter())
+        if analyze:
+            Bai_2_b.run_analysis(CSV_RESULTS)
+        with open(CSV_RESULTS, encoding='utf-8-sig') as f:
+            return f.read()
+    finally:
+        os.chdir(cwd)
+
+def apply_delta(previous, delta):
+    touched = player_keys(delta)
+    kept = previous[~player_keys(previous).isin(touched)]
+    upserts = delta[delta['Change'] == 'upsert'].drop(columns='Change')
+    updated = pd.concat([kept, upserts]).sort_values(by=['Name', 'PlayerID'])
+    return updated.reset_index(drop=True)
+
+@pytest.mark.parametrize('after', AFTER)
+def test_incremental_run_matches_full_scrape(tmp_path, capsys, after):
+    scrape(tmp_path / 'incremental', BEFORE, incremental=True)
+    previous = load_results(str(tmp_path / 'incremental' / CSV_RESULTS))
+    capsys.readouterr()
+    incremental = scrape(tmp_path / 'incremental', after, incremental=True)
+    assert capsys.readouterr().out.count("unchanged since last run") == 2
+    full = scrape(tmp_path / 'full', after, incremental=False)
+
+    assert incremental == full
+    delta = load_results(str(tmp_path / 'incremental' / DELTA_RESULTS))
+    pd.testing.assert_frame_equal(apply_delta(previous, delta), load_results(str(tmp_path / 'full' / CSV_RESULTS)))
+
+@pytest.mark.parametrize('after', AFTER)
+def test_incremental_team_report_matches_full_report(tmp_path, after):
+    scrape(tmp_path / 'incremental', BEFORE, incremental=True, analyze=True)
+    scrape(tmp_path / 'incremental', after, incremental=True, analyze=True)
+    scrape(tmp_path / 'full', after, incremental=False, analyze=True)
+
+    incremental, full = (pd.read_csv(tmp_path / run / 'results2.csv', index_col='Team') for run in ('incremental', 'full'))
+    pd.testing.assert_frame_equal(incremental, full)
+
+def test_manifest_keeps_shadowed_records(tmp_path):
+    scrape(tmp_path, BEFORE, incremental=True)
+    teams = read_manifest(os.path.join(tmp_path, MANIFEST))['teams']
+
+    assert [record['team'] for record in teams['Arsenal']['shadowed']] == ['Arsenal']
+    assert all(team['content_hash'] for team in teams.values())
+
+def test_delta_keys_players_without_an_id_by_name_and_team():
+    previous = build_results_frame({record.key: record for record in [
+        PlayerRecord('Ann Able', 'N/A', 'Wolves', values=np.ones(len(STAT_COLUMNS))),
+        PlayerRecord('Bea Bell', 'N/A', 'Wolves', values=np.ones(len(STAT_COLUMNS))),
+        PlayerRecord('Cat Cole', '0000b001', 'Wolves', values=np.ones(len(STAT_COLUMNS)))
+    ]})
+    current = previous.copy()
+    current.loc[current['Name'] == 'Bea Bell', 'performance_goals'] = 5.0
+    current = current[current['Name'] != 'Cat Cole']
+
+    delta = compute_delta(previous, current, {'Wolves'})
+    assert delta[['Name', 'Change']].values.tolist() == [['Bea Bell', 'upsert'], ['Cat Cole', 'delete']]
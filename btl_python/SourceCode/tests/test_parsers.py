@@ -0,0 +1,31 @@
+import os
+
+import pandas as pd
+import pytest
+
+from Bai_1 import available_parsers
+from benchmark_scraper import load_page, parser_results
+from conftest import FIXTURES
+
+TEAM_PAGE = os.path.join(FIXTURES, 'team_page.html')
+
+@pytest.fixture(scope='module')
+def results():
+    return parser_results(load_page(TEAM_PAGE))
+
+@pytest.mark.parametrize('parser', ['selectolax', 'lxml'])
+def test_backend_matches_html_parser(results, parser):
+    if parser not in available_parsers():
+        pytest.skip(f"{parser} is not installed")
+
+    reference, _ = results['html.parser']
+    records, _ = results[parser]
+    pd.testing.assert_frame_equal(records, reference)
+
+def test_fixture_rows_are_parsed(results):
+    records, _ = results['html.parser']
+    assert records['Name'].tolist() == ['Aaron Able', 'Bruno Baker', 'Dani Díaz']
+    assert records['PlayerID'].tolist() == ['1a2b3c4d', '5e6f7a8b', 'N/A']
+    assert records['playing_time_minutes'].tolist() == [3060.0, 1245.0, 612.0]
+    assert records['goalkeeping_save_pct'].notna().all()
+    assert records['miscellaneous_aerials_win_pct'].notna().all()
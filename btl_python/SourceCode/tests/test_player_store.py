@@ -0,0 +1,46 @@
+import itertools
+
+import pytest
+
+from Bai_1 import PlayerRecord, PlayerStore, player_key
+
+PLAYER_ID = 'abcdef12'
+KEY = player_key(PLAYER_ID, 'Joe Bloggs', 'Chelsea')
+
+def record(team, minutes):
+    player = PlayerRecord('Joe Bloggs', PLAYER_ID, team)
+    player.update({'playing_time_minutes': minutes})
+    return player
+
+@pytest.mark.parametrize('order', list(itertools.permutations(['Chelsea', 'Arsenal', 'Wolves'])))
+def test_merge_does_not_depend_on_team_order(order):
+    teams = {
+        'Arsenal': {KEY: record('Arsenal', 400)},
+        'Chelsea': {KEY: record('Chelsea', 1200)},
+        'Wolves': {}
+    }
+    store = PlayerStore()
+    for team_name in order:
+        store.add_team(team_name, teams[team_name])
+
+    merged = store.merged()
+    assert len(merged) == 1
+    assert merged[KEY].team == 'Chelsea'
+
+def test_short_spell_elsewhere_does_not_drop_a_qualifying_player():
+    store = PlayerStore()
+    store.add_team('Aston Villa', {})
+    store.add_team('Chelsea', {KEY: record('Chelsea', 1200)})
+
+    assert store.merged()[KEY].team == 'Chelsea'
+
+def test_players_without_an_id_are_kept_apart_by_team():
+    store = PlayerStore()
+    for team_name in ('Chelsea', 'Wolves'):
+        player = PlayerRecord('Joe Bloggs', 'N/A', team_name)
+        store.add_team(team_name, {player.key: player})
+    store.add_team('Arsenal', {KEY: record('Arsenal', 900)})
+
+    merged = store.merged()
+    namesakes = [merged[key] for key in merged.find_by_name('Joe Bloggs')]
+    assert sorted(player.team for player in namesakes) == ['Arsenal', 'Chelsea', 'Wolves']
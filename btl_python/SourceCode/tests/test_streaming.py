@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Bai_2_b import compute_aggregates, get_column_categories, load_and_preprocess_data, stream_analysis_report
+
+@pytest.fixture
+def results_file(tmp_path):
+    rng = np.random.default_rng(0)
+    rows = 3000
+    df = pd.DataFrame({
+        'Name': [f"Player {i}" for i in range(rows)],
+        'PlayerID': [f"{i:08x}" for i in range(rows)],
+        'Team': rng.choice([f"Team {i:03d}" for i in range(40)], rows),
+        'goals': rng.poisson(3, rows).astype(float),
+        'minutes': np.round(rng.gamma(2, 600, rows)),
+        'plus_minus': rng.normal(0, 5, rows).round(1)
+    })
+    df.loc[rng.choice(rows, 200, replace=False), 'goals'] = np.nan
+    path = tmp_path / 'results.csv'
+    df.to_csv(path, index=False, encoding='utf-8-sig')
+    return str(path)
+
+@pytest.mark.parametrize('chunk_rows', [64, 50000])
+def test_streamed_report_matches_exact_aggregates(results_file, tmp_path, chunk_rows):
+    data = load_and_preprocess_data(results_file)
+    stat_cols = get_column_categories(data)['statistical']
+    exact = pd.concat([compute_aggregates(data, stat_cols), compute_aggregates(data, stat_cols, 'Team')])
+
+    output = tmp_path / 'results2.csv'
+    stream_analysis_report(results_file, str(output), chunk_rows=chunk_rows)
+    streamed = pd.read_csv(output, index_col='Team')
+
+    assert list(streamed.index) == ['All'] + sorted(data['Team'].unique())
+    medians = [col for col in streamed.columns if col.startswith('Median')]
+    others = [col for col in streamed.columns if col not in medians]
+    np.testing.assert_allclose(streamed[others].to_numpy(), exact[others].to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(streamed[medians].to_numpy(), exact[medians].to_numpy(), rtol=0.01, atol=1e-3)